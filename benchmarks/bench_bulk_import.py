@@ -0,0 +1,32 @@
+"""Measure throughput of add_many compared to add. Usage: python bench_bulk_import.py [ROWS]"""
+
+import sys
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+from common import synthetic_records
+from phonebook import Phonebook
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    records = synthetic_records(count)
+
+    print(f"{count} records")
+    print(f"{'method':>10}{'rows/s':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        phonebook = Phonebook(Path(tmp) / "add.csv")
+        start = perf_counter()
+        for record in records:
+            phonebook.add(record)
+        print(f"{'add':>10}{count / (perf_counter() - start):>12.0f}")
+
+        phonebook = Phonebook(Path(tmp) / "add_many.csv")
+        start = perf_counter()
+        phonebook.add_many(records, max_length=16)
+        print(f"{'add_many':>10}{count / (perf_counter() - start):>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""Compare edit latency with and without the journal. Usage: python bench_edit.py [ROWS ...]"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+from common import synthetic_records, timeit, write_csv
+from phonebook import Phonebook
+
+
+def main() -> None:
+    counts = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000]
+
+    print(f"{'records':>10}{'rewrite, ms':>14}{'journal, ms':>14}")
+    for count in counts:
+        records = synthetic_records(count)
+        with tempfile.TemporaryDirectory() as tmp:
+            file = Path(tmp) / "phonebook.csv"
+            write_csv(file, records)
+
+            times = []
+            for use_journal in (False, True):
+                phonebook = Phonebook(file, use_journal=use_journal, compact_threshold=10**9)
+                record = dict(phonebook.records[count // 2])
+                times.append(timeit(lambda: phonebook.edit(count // 2 + 1, record)))
+                phonebook.close()
+
+            print(f"{count:>10}{times[0] * 1000:>14.2f}{times[1] * 1000:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""Measure time to the first page of records for each layout. Usage: python bench_lazy.py [ROWS ...]"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+from common import iter_synthetic_records, timeit, write_csv
+from phonebook import Phonebook
+
+
+def main() -> None:
+    counts = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+
+    def first_page(file: Path, layout: str) -> None:
+        phonebook = Phonebook(file, layout=layout)
+        phonebook.records[:10]
+        phonebook.close()
+
+    print(f"{'records':>10}{'rows, ms':>12}{'lazy (no index), ms':>22}{'lazy, ms':>12}")
+    for count in counts:
+        with tempfile.TemporaryDirectory() as tmp:
+            file = Path(tmp) / "phonebook.csv"
+            write_csv(file, iter_synthetic_records(count))
+
+            rows_time = timeit(lambda: first_page(file, "rows"), repeat=3)
+            # The first lazy load builds the sidecar index, the following ones just read it
+            cold_time = timeit(lambda: first_page(file, "lazy"), repeat=1)
+            warm_time = timeit(lambda: first_page(file, "lazy"))
+            print(f"{count:>10}{rows_time * 1000:>12.1f}{cold_time * 1000:>22.1f}{warm_time * 1000:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
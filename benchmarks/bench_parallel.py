@@ -0,0 +1,47 @@
+"""Measure how parallel search scales with the number of workers.
+
+Usage: python bench_parallel.py [ROWS] [MAX_WORKERS]
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+from common import iter_synthetic_records, timeit, write_csv
+from phonebook import Phonebook
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        file = Path(tmp) / "phonebook.csv"
+        write_csv(file, iter_synthetic_records(count))
+
+        phonebook = Phonebook(file)
+        # Values of an existing record, so that the strict query finds something
+        sample = phonebook.records[count // 2]
+        queries = [({"Организация": "нефть"}, False), ({"Имя": sample["Имя"], "Фамилия": sample["Фамилия"]}, True)]
+        scan_time = sum(
+            timeit(lambda: phonebook.search(criteria, is_strict, False), repeat=3) for criteria, is_strict in queries
+        )
+        print(f"{count} records, {len(queries)} queries")
+        print(f"{'workers':>8}{'time, ms':>12}{'speedup':>10}")
+        print(f"{'scan':>8}{scan_time * 1000:>12.1f}{1:>10.2f}")
+
+        for workers in range(1, max_workers + 1):
+            phonebook = Phonebook(file, search_backend="parallel", search_workers=workers)
+            # The first search starts the workers and sends the shards to them
+            phonebook.search(*queries[0], False)
+            parallel_time = sum(
+                timeit(lambda: phonebook.search(criteria, is_strict, False), repeat=3)
+                for criteria, is_strict in queries
+            )
+            print(f"{workers:>8}{parallel_time * 1000:>12.1f}{scan_time / parallel_time:>10.2f}")
+            phonebook.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Compare phone number lookups by the phone index with the substring scan. Usage: python bench_phone.py [ROWS ...]"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+from common import synthetic_records, timeit, write_csv
+from phone_index import PhoneIndex
+from phonebook import Phonebook
+
+
+def check_trunk_prefix() -> None:
+    """Make sure numbers starting with 8 are found alike by prefix and exact lookups, whatever their length"""
+    numbers = ("8-12-34", "8 (957) 386-03-58", "+79573860358", "7-12-34")
+    index = PhoneIndex(("Рабочий телефон",), [{"Рабочий телефон": number} for number in numbers])
+    assert index.find("8-12") == index.find("81234", "exact") == [0]
+    assert index.find("8 (957)") == index.find("+7957") == index.find("89573860358", "exact") == [1, 2]
+    assert index.find("7-12") == [3]
+
+
+def main() -> None:
+    counts = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    check_trunk_prefix()
+
+    print(f"{'records':>10}{'query':>22}{'found':>8}{'scan, ms':>12}{'index, ms':>12}{'build, s':>10}")
+    for count in counts:
+        records = synthetic_records(count)
+        number = records[count // 2]["Рабочий телефон"]
+        with tempfile.TemporaryDirectory() as tmp:
+            file = Path(tmp) / "phonebook.csv"
+            write_csv(file, records)
+            phonebook = Phonebook(file)
+
+            build_time = timeit(lambda: phonebook.search_phone(number), repeat=1)
+            queries = (
+                ("prefix", number[:8], {"Рабочий телефон": number[:8]}),
+                ("exact", number, {"Рабочий телефон": number}),
+                ("suffix", number[-4:], {"Рабочий телефон": number[-4:]}),
+            )
+            for mode, value, criteria in queries:
+                scan_time = timeit(lambda: phonebook.search(criteria, False, True))
+                index_time = timeit(lambda: phonebook.search_phone(value, mode, ("Рабочий телефон",)))
+                found = len(phonebook.search_phone(value, mode, ("Рабочий телефон",)))
+                print(
+                    f"{count:>10}{f'{mode} {value}':>22}{found:>8}{scan_time * 1000:>12.3f}{index_time * 1000:>12.3f}"
+                    f"{build_time:>10.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
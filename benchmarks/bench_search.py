@@ -0,0 +1,50 @@
+"""Compare search backends against the linear scan. Usage: python bench_search.py [ROWS]"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+from common import synthetic_records, timeit, write_csv
+from phonebook import Phonebook
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    records = synthetic_records(count)
+    queries = [
+        ({"Фамилия": records[count // 2]["Фамилия"]}, True),
+        ({"Организация": records[count // 3]["Организация"][:5]}, False),
+        ({"Имя": records[7]["Имя"], "Организация": records[7]["Организация"]}, True),
+        ({"Рабочий телефон": records[count - 1]["Рабочий телефон"][-6:]}, False),
+        ({"Имя": "ан", "Фамилия": "ов"}, False),
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        file = Path(tmp) / "phonebook.csv"
+        write_csv(file, records)
+        phonebooks = {backend: Phonebook(file, search_backend=backend) for backend in Phonebook.search_backends}
+
+        print(f"{count} records, best time in ms (first call in parentheses)")
+        print(f"{'query':<58}{'case':>5}{'found':>7}", *(f"{backend:>18}" for backend in phonebooks), sep="")
+        for criteria, is_strict in queries:
+            for is_case_sensitive in (True, False):
+                expected = phonebooks["scan"].search(criteria, is_strict, is_case_sensitive)
+                times = []
+                for phonebook in phonebooks.values():
+                    # The first call may build indexes, so it's shown separately
+                    first_time = timeit(lambda: phonebook.search(criteria, is_strict, is_case_sensitive), repeat=1)
+                    assert phonebook.search(criteria, is_strict, is_case_sensitive) == expected
+                    best_time = timeit(lambda: phonebook.search(criteria, is_strict, is_case_sensitive))
+                    times.append(f"{best_time * 1000:.2f} ({first_time * 1000:.0f})")
+
+                title = f"{'==' if is_strict else 'in'} {criteria}"
+                case = "yes" if is_case_sensitive else "no"
+                print(f"{title:<58}{case:>5}{len(expected):>7}", *(f"{time:>18}" for time in times), sep="")
+
+        # Stops the workers of the parallel backend, their pools can't be shut down at exit
+        for phonebook in phonebooks.values():
+            phonebook.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""Compare startup time from the CSV file and from the snapshot. Usage: python bench_snapshot.py [ROWS ...]"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+from common import iter_synthetic_records, timeit, write_csv
+from phonebook import Phonebook
+
+
+def main() -> None:
+    counts = [int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000, 10_000_000]
+
+    print(f"{'records':>10}{'layout':>10}{'CSV, s':>10}{'snapshot, s':>14}{'speedup':>10}")
+    for count in counts:
+        with tempfile.TemporaryDirectory() as tmp:
+            file = Path(tmp) / "phonebook.csv"
+            write_csv(file, iter_synthetic_records(count))
+
+            for layout in ("rows", "columns"):
+                csv_time = timeit(lambda: Phonebook(file, layout=layout), repeat=3)
+                # The first load writes the snapshot, the following ones read it
+                Phonebook(file, layout=layout, use_snapshot=True)
+                snapshot_time = timeit(lambda: Phonebook(file, layout=layout, use_snapshot=True), repeat=3)
+                print(
+                    f"{count:>10}{layout:>10}{csv_time:>10.2f}{snapshot_time:>14.2f}{csv_time / snapshot_time:>10.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Compare the first page of a sorted view with a full sort, and measure keeping it sorted.
+Usage: python bench_sort.py [ROWS ...]"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+from common import synthetic_records, timeit, write_csv
+from phonebook import Phonebook
+from sorting import sort_key
+
+
+def main() -> None:
+    counts = [int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000]
+    fields = ("Фамилия", "Имя")
+
+    print(f"{'records':>10}{'keys, s':>10}{'page 1, ms':>12}{'sorted(), s':>13}{'add, ms':>10}{'all pages, s':>14}")
+    for count in counts:
+        with tempfile.TemporaryDirectory() as tmp:
+            file = Path(tmp) / "phonebook.csv"
+            write_csv(file, synthetic_records(count))
+            phonebook = Phonebook(file, use_journal=True, compact_threshold=10**9)
+
+            keys_time = timeit(lambda: phonebook.sorted_by(fields), repeat=1)
+            view = phonebook.sorted_by(fields)
+            page_time = timeit(lambda: view[:10], repeat=1)
+            full_time = timeit(
+                lambda: sorted(phonebook.records, key=lambda record: tuple(sort_key(record[f]) for f in fields)),
+                repeat=1,
+            )
+            # Records added once the view is sorted are inserted by bisection
+            view[: count // 2]
+            record = dict(phonebook.records[0])
+            add_time = timeit(lambda: phonebook.add({**record, "ID": f"{len(phonebook.records) + 1}"}), repeat=10)
+            all_time = timeit(lambda: view[:], repeat=1)
+            print(
+                f"{count:>10}{keys_time:>10.2f}{page_time * 1000:>12.2f}{full_time:>13.2f}{add_time * 1000:>10.3f}"
+                f"{all_time:>14.2f}"
+            )
+            phonebook.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Compare memory use and load time of the record layouts. Usage: python bench_store.py [ROWS ...]"""
+
+import sys
+import subprocess
+import tempfile
+import tracemalloc
+from pathlib import Path
+from time import perf_counter
+
+from common import iter_synthetic_records, write_csv
+from phonebook import Phonebook
+
+
+def measure(file: Path, layout: str, what: str) -> float:
+    """Load the file in this process and return load time in seconds or allocated memory in bytes"""
+    if what == "memory":
+        tracemalloc.start()
+        phonebook = Phonebook(file, layout=layout)
+        result = tracemalloc.get_traced_memory()[0]
+    else:
+        start = perf_counter()
+        phonebook = Phonebook(file, layout=layout)
+        result = perf_counter() - start
+    # Measured before closing, so that the records are still in memory and aren't freed within the timing
+    phonebook.close()
+    return result
+
+
+def main() -> None:
+    if sys.argv[1:2] == ["--child"]:
+        print(measure(Path(sys.argv[2]), sys.argv[3], sys.argv[4]))
+        return
+
+    counts = [int(arg) for arg in sys.argv[1:]] or [1_000_000, 10_000_000]
+
+    print(f"{'records':>10}{'layout':>10}{'CSV, MiB':>12}{'memory, MiB':>14}{'load, s':>10}")
+    for count in counts:
+        with tempfile.TemporaryDirectory() as tmp:
+            file = Path(tmp) / "phonebook.csv"
+            write_csv(file, iter_synthetic_records(count))
+
+            for layout in Phonebook.layouts:
+                # Every measurement runs in a fresh process, so they don't affect each other
+                memory, load_time = (
+                    float(subprocess.check_output([sys.executable, __file__, "--child", file, layout, what]))
+                    for what in ("memory", "time")
+                )
+                print(
+                    f"{count:>10}{layout:>10}{file.stat().st_size / 2**20:>12.1f}"
+                    f"{memory / 2**20:>14.1f}{load_time:>10.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import sys
+from collections.abc import Iterable, Iterator
+from csv import DictWriter
+from pathlib import Path
+from time import perf_counter
+
+from generator import FIELDNAMES, generate_records
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+
+def synthetic_records(count: int, seed: int = 0) -> list[dict]:
+    """Make records with generate_records(), see generator.py"""
+    return list(generate_records(count, seed))
+
+
+def iter_synthetic_records(count: int, seed: int = 0) -> Iterator[dict]:
+    """Same as synthetic_records, but records are generated one by one"""
+    return generate_records(count, seed)
+
+
+def write_csv(path: Path, records: Iterable[dict]) -> None:
+    """Write records to a phonebook file"""
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = DictWriter(f, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        writer.writerows(records)
+
+
+def timeit(func, repeat: int = 5) -> float:
+    """Return the best wall time of several runs, in seconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = perf_counter()
+        func()
+        best = min(best, perf_counter() - start)
+    return best
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Return the value below which the given fraction of sorted values falls"""
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
@@ -0,0 +1,150 @@
+"""Synthetic phonebook records with Russian names and a skewed distribution of organizations.
+Usage: python generator.py ROWS [-o FILE] [--seed SEED] [--organizations COUNT]"""
+
+import random
+from argparse import ArgumentParser
+from bisect import bisect
+from csv import DictWriter
+from collections.abc import Iterator
+from itertools import accumulate
+from pathlib import Path
+
+FIELDNAMES = ("ID", "Имя", "Отчество", "Фамилия", "Организация", "Рабочий телефон", "Личный телефон")
+
+# fmt: off
+MALE_NAMES = (
+    "Александр", "Алексей", "Анатолий", "Андрей", "Антон", "Аркадий", "Артём", "Борис", "Вадим", "Валентин",
+    "Валерий", "Василий", "Виктор", "Виталий", "Владимир", "Владислав", "Всеволод", "Геннадий", "Георгий", "Глеб",
+    "Григорий", "Даниил", "Денис", "Дмитрий", "Евгений", "Егор", "Иван", "Игнат", "Игорь", "Илья", "Кирилл",
+    "Константин", "Лев", "Леонид", "Макар", "Максим", "Марк", "Матвей", "Михаил", "Никита", "Николай", "Олег",
+    "Павел", "Пётр", "Роман", "Руслан", "Семён", "Сергей", "Станислав", "Степан", "Тимофей", "Фёдор", "Филипп",
+    "Юрий", "Ярослав",
+)
+FEMALE_NAMES = (
+    "Алевтина", "Алина", "Алла", "Анастасия", "Ангелина", "Анна", "Антонина", "Валентина", "Валерия", "Варвара",
+    "Вера", "Вероника", "Виктория", "Галина", "Дарья", "Евгения", "Екатерина", "Елена", "Елизавета", "Жанна",
+    "Зинаида", "Зоя", "Инна", "Ирина", "Карина", "Кира", "Ксения", "Лариса", "Людмила", "Маргарита", "Марина",
+    "Мария", "Надежда", "Наталья", "Нина", "Оксана", "Ольга", "Полина", "Раиса", "Светлана", "София", "Тамара",
+    "Татьяна", "Ульяна", "Юлия", "Яна",
+)
+# Male forms, female ones are derived by female_surname()
+SURNAMES = (
+    "Абрамов", "Александров", "Алексеев", "Андреев", "Антонов", "Архипов", "Белов", "Беляев", "Богданов", "Борисов",
+    "Быков", "Васильев", "Виноградов", "Волков", "Воробьёв", "Воронин", "Гаврилов", "Герасимов", "Голубев",
+    "Гончаров", "Горбунов", "Григорьев", "Гусев", "Давыдов", "Денисов", "Дмитриев", "Егоров", "Жуков", "Зайцев",
+    "Захаров", "Ильин", "Калинин", "Карпов", "Киселёв", "Ковалёв", "Козлов", "Комаров", "Кондратьев", "Королёв",
+    "Котов", "Крылов", "Кудрявцев", "Кузнецов", "Кузьмин", "Лебедев", "Макаров", "Медведев", "Мельников",
+    "Миронов", "Михайлов", "Морозов", "Никитин", "Николаев", "Новиков", "Орлов", "Осипов", "Павлов", "Петров",
+    "Поляков", "Попов", "Романов", "Савельев", "Семёнов", "Сергеев", "Смирнов", "Соболев", "Соколов", "Соловьёв",
+    "Степанов", "Тарасов", "Тимофеев", "Титов", "Фёдоров", "Филиппов", "Фролов", "Чернов", "Шубин", "Щербаков",
+    "Яковлев", "Вишневский", "Островский", "Покровский", "Троицкий", "Толстой", "Шевченко", "Черных", "Седых",
+)
+# Patronymics that don't follow the usual rules, as (male, female)
+IRREGULAR_PATRONYMICS = {
+    "Георгий": ("Георгиевич", "Георгиевна"),
+    "Дмитрий": ("Дмитриевич", "Дмитриевна"),
+    "Михаил": ("Михайлович", "Михайловна"),
+    "Илья": ("Ильич", "Ильинична"),
+    "Никита": ("Никитич", "Никитична"),
+    "Лев": ("Львович", "Львовна"),
+    "Павел": ("Павлович", "Павловна"),
+    "Пётр": ("Петрович", "Петровна"),
+}
+
+# Real companies come first, as the most frequent ones
+ORGANIZATIONS = (
+    "Газпром", "Лукойл", "Роснефть", "Сбербанк", "РЖД", "Ростелеком", "Магнит", "Аэрофлот", "НоваТЭК", "Норникель",
+    "Северсталь", "Татнефть", "Сургутнефтегаз", "Росатом", "МТС", "Мегафон", "Билайн", "Яндекс", "ВТБ", "Альфа-Банк",
+    "Пятёрочка", "Иркутскэнерго", "Мосметрострой", "Россети", "Русал", "Уралкалий", "АвтоВАЗ", "КАМАЗ", "Ашан",
+    "Лента", "Почта России", "Совкомфлот", "Полюс", "Акрон", "Фосагро", "Инпром", "Группа ВСК", "Ингосстрах",
+)
+# Parts of made-up companies used once the real ones run out
+ORGANIZATION_ROOTS = (
+    "Волга", "Урал", "Сибирь", "Нева", "Кама", "Дон", "Балтика", "Алтай", "Енисей", "Амур", "Север", "Восток",
+    "Юг", "Центр", "Мега", "Гранд", "Спектр", "Вектор", "Альфа", "Гамма", "Титан", "Меридиан", "Квант", "Импульс",
+)
+ORGANIZATION_SUFFIXES = (
+    "строй", "энерго", "торг", "транс", "сервис", "пром", "нефть", "газ", "лес", "агро", "медиа", "софт", "маш",
+    "хим", "снаб", "инвест", "банк", "телеком", "логистик", "металл",
+)
+# fmt: on
+MAX_ORGANIZATIONS = len(ORGANIZATIONS) + len(ORGANIZATION_ROOTS) * len(ORGANIZATION_SUFFIXES)
+
+
+def patronymic(father_name: str, is_female: bool) -> str:
+    """Derive a patronymic from a male first name"""
+    if father_name in IRREGULAR_PATRONYMICS:
+        return IRREGULAR_PATRONYMICS[father_name][is_female]
+    if father_name.endswith("ий"):
+        return father_name[:-2] + ("ьевна" if is_female else "ьевич")
+    if father_name.endswith(("й", "ь")):
+        return father_name[:-1] + ("евна" if is_female else "евич")
+    return father_name + ("овна" if is_female else "ович")
+
+
+def female_surname(surname: str) -> str:
+    """Return the female form of a male surname"""
+    if surname.endswith(("ов", "ев", "ёв", "ин", "ын")):
+        return surname + "а"
+    if surname.endswith(("ский", "цкий", "ой")):
+        return surname[:-2] + "ая"
+    # E.g. Шевченко and Черных are the same for both
+    return surname
+
+
+def organization_names(count: int) -> list[str]:
+    """Return count distinct organization names, real ones first"""
+    names = list(ORGANIZATIONS[:count])
+    made_up = (root + suffix for suffix in ORGANIZATION_SUFFIXES for root in ORGANIZATION_ROOTS)
+    for name in made_up:
+        if len(names) >= count:
+            break
+        names.append(name)
+    if len(names) < count:
+        raise ValueError(f"Can't make more than {MAX_ORGANIZATIONS} organization names")
+    return names
+
+
+def generate_records(
+    count: int, seed: int = 0, organizations: int | None = None, skew: float = 1.1
+) -> Iterator[dict[str, str]]:
+    """Yield count records with sequential IDs. Organizations follow a Zipf-like distribution with the given skew:
+    the k-th one is chosen with probability proportional to 1 / k ** skew, so a few of them are in most records.
+    By default there is an organization per 100 records, but not less than 10."""
+    rng = random.Random(seed)
+    if organizations is None:
+        organizations = min(max(10, count // 100), MAX_ORGANIZATIONS)
+    organization_pool = organization_names(organizations)
+    cum_weights = list(accumulate(1 / k**skew for k in range(1, organizations + 1)))
+    total_weight = cum_weights[-1]
+
+    for i in range(1, count + 1):
+        is_female = rng.random() < 0.5
+        surname = rng.choice(SURNAMES)
+        yield {
+            "ID": f"{i}",
+            "Имя": rng.choice(FEMALE_NAMES if is_female else MALE_NAMES),
+            "Отчество": patronymic(rng.choice(MALE_NAMES), is_female),
+            "Фамилия": female_surname(surname) if is_female else surname,
+            "Организация": organization_pool[bisect(cum_weights, rng.random() * total_weight)],
+            "Рабочий телефон": f"+79{rng.randrange(10**9):09}",
+            "Личный телефон": f"+79{rng.randrange(10**9):09}",
+        }
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Generate a phonebook CSV file with synthetic records")
+    parser.add_argument("rows", type=int, help="number of records")
+    parser.add_argument("-o", "--output", type=Path, default=Path("phonebook.csv"), help="output file")
+    parser.add_argument("--seed", type=int, default=0, help="random seed, the same seed gives the same records")
+    parser.add_argument("--organizations", type=int, help="number of distinct organizations")
+    args = parser.parse_args()
+
+    with open(args.output, "w", encoding="utf-8", newline="") as f:
+        writer = DictWriter(f, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        writer.writerows(generate_records(args.rows, args.seed, args.organizations))
+
+
+if __name__ == "__main__":
+    main()
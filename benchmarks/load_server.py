@@ -0,0 +1,74 @@
+"""Load generator for server.py. Start the server first, then run:
+python load_server.py [--host HOST] [--port PORT] [--connections N] [--requests N] [--pipeline N] [--writes FRACTION]
+"""
+
+import asyncio
+import json
+import random
+from argparse import ArgumentParser
+from time import perf_counter
+
+from common import percentile
+
+
+async def run_connection(args, requests: int, latencies: list[float], rng: random.Random) -> None:
+    """Send requests over one connection, keeping up to `args.pipeline` of them in flight"""
+    reader, writer = await asyncio.open_connection(args.host, args.port)
+    sent_at: dict[int, float] = {}
+    in_flight = asyncio.Semaphore(args.pipeline)
+
+    async def receive() -> None:
+        for _ in range(requests):
+            response = json.loads(await reader.readline())
+            latencies.append(perf_counter() - sent_at.pop(response["id"]))
+            if not response["ok"]:
+                print("Ошибка:", response["error"])
+            in_flight.release()
+
+    receiver = asyncio.create_task(receive())
+    for request_id in range(requests):
+        if rng.random() < args.writes:
+            request = {"op": "edit", "record_id": 1, "record": {"Имя": f"Тест{request_id % 100}"}}
+        elif rng.random() < 0.5:
+            request = {"op": "get", "record_id": 1}
+        else:
+            request = {"op": "search", "criteria": {"Имя": rng.choice(("ан", "Ив", "ов", "ина", "Сер"))}}
+        request["id"] = request_id
+
+        await in_flight.acquire()
+        sent_at[request_id] = perf_counter()
+        writer.write(json.dumps(request, ensure_ascii=False).encode("utf-8") + b"\n")
+        await writer.drain()
+
+    await receiver
+    writer.close()
+    await writer.wait_closed()
+
+
+async def main() -> None:
+    parser = ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--connections", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=2000, help="requests per connection")
+    parser.add_argument("--pipeline", type=int, default=16, help="max requests in flight per connection")
+    parser.add_argument("--writes", type=float, default=0.0, help="fraction of edit requests (they overwrite record 1)")
+    args = parser.parse_args()
+
+    latencies: list[float] = []
+    start = perf_counter()
+    await asyncio.gather(
+        *(run_connection(args, args.requests, latencies, random.Random(i)) for i in range(args.connections))
+    )
+    elapsed = perf_counter() - start
+
+    latencies.sort()
+    print(f"{len(latencies)} requests in {elapsed:.2f} s: {len(latencies) / elapsed:.0f} requests/s")
+    print(
+        f"latency, ms: p50 {percentile(latencies, 0.5) * 1000:.2f}, p99 {percentile(latencies, 0.99) * 1000:.2f}, "
+        f"max {latencies[-1] * 1000:.2f}"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
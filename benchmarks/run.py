@@ -0,0 +1,160 @@
+"""Benchmark suite of the Phonebook core on generated records. Results are saved as JSON, two runs can be compared.
+Usage: python run.py run [--rows ROWS ...] [--repeat N] [-o FILE]
+       python run.py compare OLD NEW [--threshold FRACTION]"""
+
+import io
+import json
+import platform
+import sys
+import tempfile
+from argparse import ArgumentParser
+from datetime import datetime
+from pathlib import Path
+from statistics import median
+from time import perf_counter
+
+from common import synthetic_records, timeit, write_csv
+from config import Config
+from phonebook import Phonebook
+from program import Program
+from screen import Screen
+
+
+def per_call(func, number: int, repeat: int) -> float:
+    """Return the best mean wall time of a call among several runs of number calls, in seconds"""
+    return timeit(lambda: [func() for _ in range(number)], repeat) / number
+
+
+def make_program(phonebook: Phonebook, config: Config) -> Program:
+    """Program without its menus and prompts, just to call its methods"""
+    program = Program.__new__(Program)
+    program.config = config
+    program.phonebook = phonebook
+    return program
+
+
+def run_case(count: int, repeat: int) -> dict[str, float]:
+    """Measure every operation on a phonebook of count records"""
+    records = synthetic_records(count)
+    middle = records[count // 2]
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        file = Path(tmp) / "phonebook.csv"
+        write_csv(file, records)
+        config = Config(Path(tmp) / "settings.ini")
+        del records
+
+        results["load"] = timeit(lambda: Phonebook(file), repeat)
+        phonebook = Phonebook(file)
+
+        queries = {
+            "search_strict": {"Фамилия": middle["Фамилия"], "Имя": middle["Имя"]},
+            "search_non_strict": {"Имя": "ан", "Фамилия": "ов"},
+        }
+        for name, criteria in queries.items():
+            is_strict = name == "search_strict"
+            for is_case_sensitive, case in ((True, "case_sensitive"), (False, "case_insensitive")):
+                search = lambda: phonebook.search(criteria, is_strict, is_case_sensitive)
+                results[f"{name}_{case}"] = timeit(search, repeat)
+
+        program = make_program(phonebook, config)
+        chunk_records = program._Program__chunk_records
+        # Pages are sliced on access, so all of them are walked through
+        results["chunk_records"] = timeit(lambda: list(chunk_records(phonebook.records)), repeat)
+        page = chunk_records(phonebook.records)[0]
+        results["render_table"] = per_call(lambda: program._Program__render_table(page), 100, repeat)
+        # Paging redraws only the changed lines of the frame
+        screen = Screen(io.StringIO())
+        pages = chunk_records(phonebook.records)
+        frames = [f"{program._Program__render_table(pages[i])}\nВведите номер пункта меню: " for i in (0, 1)]
+        results["draw_page"] = per_call(lambda: [screen.draw(frame) for frame in frames], 50, repeat) / len(frames)
+
+        # Writes change the file, so they go last. An edit rewrites the whole file, so it's measured a few times.
+        times = []
+        for i in range(10):
+            record = {**middle, "ID": f"{len(phonebook.records) + 1}", "Имя": f"{middle['Имя']}{i}"}
+            start = perf_counter()
+            phonebook.add(record)
+            times.append(perf_counter() - start)
+        results["add"] = median(times)
+
+        times = []
+        for i in range(min(repeat, 3)):
+            record = {**middle, "Имя": f"{middle['Имя']}{i}"}
+            start = perf_counter()
+            phonebook.edit(int(middle["ID"]), record)
+            times.append(perf_counter() - start)
+        results["edit"] = median(times)
+        phonebook.close()
+
+    return results
+
+
+def run(counts: list[int], repeat: int, output: Path) -> None:
+    """Run the suite for every number of records and save the results"""
+    results = {}
+    for count in counts:
+        results[f"{count}"] = run_case(count, repeat)
+        for name, seconds in results[f"{count}"].items():
+            print(f"{count:>10} {name:<36}{seconds * 1000:>14.3f} ms")
+
+    meta = {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+    }
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({"meta": meta, "results": results}, f, ensure_ascii=False, indent=2)
+    print(f"Saved to {output}")
+
+
+def compare(old_file: Path, new_file: Path, threshold: float) -> bool:
+    """Print the change of every measurement present in both runs. Return True if any got slower than threshold."""
+    with open(old_file, "r", encoding="utf-8") as f:
+        old_results = json.load(f)["results"]
+    with open(new_file, "r", encoding="utf-8") as f:
+        new_results = json.load(f)["results"]
+
+    has_regressions = False
+    print(f"{'records':>10} {'name':<36}{'old, ms':>14}{'new, ms':>14}{'change':>10}")
+    for count in (count for count in old_results if count in new_results):
+        for name in (name for name in old_results[count] if name in new_results[count]):
+            old, new = old_results[count][name], new_results[count][name]
+            change = new / old - 1 if old else 0.0
+            verdict = ""
+            if change > threshold:
+                verdict = "  REGRESSION"
+                has_regressions = True
+            elif change < -threshold:
+                verdict = "  improvement"
+            print(f"{count:>10} {name:<36}{old * 1000:>14.3f}{new * 1000:>14.3f}{change:>+10.1%}{verdict}")
+    return has_regressions
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Benchmark suite of the Phonebook core")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="run the benchmarks and save the results")
+    run_parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000], help="numbers of records")
+    run_parser.add_argument("--repeat", type=int, default=5, help="runs of each measurement, the best one is kept")
+    run_parser.add_argument("-o", "--output", type=Path, default=Path("results.json"), help="results file")
+
+    compare_parser = subparsers.add_parser("compare", help="compare two results files")
+    compare_parser.add_argument("old", type=Path)
+    compare_parser.add_argument("new", type=Path)
+    compare_parser.add_argument(
+        "--threshold", type=float, default=0.1, help="relative slowdown reported as a regression (default 0.1)"
+    )
+
+    args = parser.parse_args()
+    if args.command == "run":
+        run(args.rows, args.repeat, args.output)
+    elif compare(args.old, args.new, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import json
+import sys
+from collections.abc import Iterable, Sequence
+from csv import writer
+from time import perf_counter
+from typing import TextIO
+
+from matching import make_matcher, normalize_criteria
+from phonebook import Phonebook
+
+# Operators of phone number criteria, e.g. "Рабочий телефон^=+7957" or "Личный телефон$=0358"
+phone_operators = {"^": "prefix", "$": "suffix"}
+
+
+def parse_query(
+    line: str, fieldnames: Sequence[str], phone_fieldnames: Sequence[str] = ()
+) -> tuple[dict[str, str], dict[str, tuple[str, str]]]:
+    """Turn a line like "Имя=Иван; Организация=Лукойл; Рабочий телефон^=+7957" into search criteria
+    and phone criteria (field -> (mode, number))"""
+    search_criteria, phone_criteria = {}, {}
+    for part in line.split(";"):
+        name, separator, value = part.partition("=")
+        if not separator:
+            raise ValueError(f"некорректный критерий '{part.strip()}'")
+        name = name.strip()
+        if (mode := phone_operators.get(name[-1:])) is not None:
+            if (name := name[:-1].strip()) not in phone_fieldnames:
+                raise ValueError(f"поиск по началу или концу номера невозможен в поле '{name}'")
+            phone_criteria[name] = (mode, value.strip())
+            continue
+        if name not in fieldnames:
+            raise ValueError(f"некорректный критерий '{part.strip()}'")
+        search_criteria[name] = value.strip()
+    return search_criteria, phone_criteria
+
+
+def find_records(
+    phonebook: Phonebook,
+    search_criteria: dict[str, str],
+    phone_criteria: dict[str, tuple[str, str]],
+    is_strict: bool,
+    is_case_sensitive: bool,
+) -> list:
+    """Return records matching both kinds of criteria. Phone criteria are looked up first, being the most selective."""
+    if not phone_criteria:
+        return phonebook.search(search_criteria, is_strict, is_case_sensitive)
+
+    found_records = None
+    for name, (mode, number) in phone_criteria.items():
+        records = phonebook.search_phone(number, mode, (name,))
+        if found_records is None:
+            found_records = records
+        else:
+            ids = {record["ID"] for record in records}
+            found_records = [record for record in found_records if record["ID"] in ids]
+    matches = make_matcher(normalize_criteria(search_criteria, is_case_sensitive), is_strict, is_case_sensitive)
+    return [record for record in found_records if matches(record)]
+
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    """Return the value below which the given fraction of sorted values falls"""
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def run_batch(
+    phonebook: Phonebook,
+    lines: Iterable[str],
+    output: TextIO,
+    output_format: str,
+    is_strict: bool,
+    is_case_sensitive: bool,
+    verbose: bool = False,
+) -> None:
+    """Run a query per line and stream found records to output as CSV or JSON Lines.
+    Latency and throughput are reported to stderr."""
+    csv_writer = writer(output)
+    if output_format == "csv":
+        csv_writer.writerow(("Запрос", *phonebook.fieldnames))
+
+    latencies = []
+    found_count = 0
+    start = perf_counter()
+    for line_number, line in enumerate(lines, 1):
+        if not (line := line.strip()) or line.startswith("#"):
+            continue
+
+        try:
+            search_criteria, phone_criteria = parse_query(line, phonebook.fieldnames, phonebook.phone_index.fields)
+        except ValueError as e:
+            print(f"Строка {line_number}: {e}", file=sys.stderr)
+            continue
+
+        query_start = perf_counter()
+        found_records = find_records(phonebook, search_criteria, phone_criteria, is_strict, is_case_sensitive)
+        latencies.append(perf_counter() - query_start)
+        found_count += len(found_records)
+
+        for record in found_records:
+            if output_format == "csv":
+                csv_writer.writerow((line_number, *record.values()))
+            else:
+                output.write(json.dumps({"query": line_number, "record": dict(record)}, ensure_ascii=False) + "\n")
+
+        if verbose:
+            print(
+                f"Строка {line_number}: найдено {len(found_records)}, {latencies[-1] * 1000:.3f} мс",
+                file=sys.stderr,
+            )
+    elapsed = perf_counter() - start
+    output.flush()
+
+    if not latencies:
+        print("Запросов не было", file=sys.stderr)
+        return
+
+    latencies.sort()
+    print(
+        f"Запросов: {len(latencies)}, найдено записей: {found_count}, время: {elapsed:.3f} с "
+        f"({len(latencies) / elapsed:.0f} запросов/с)\n"
+        f"Задержка, мс: p50 {percentile(latencies, 0.5) * 1000:.3f}, p99 {percentile(latencies, 0.99) * 1000:.3f}, "
+        f"макс. {latencies[-1] * 1000:.3f}",
+        file=sys.stderr,
+    )
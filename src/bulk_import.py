@@ -0,0 +1,41 @@
+import sys
+from argparse import ArgumentParser
+from csv import DictReader
+from pathlib import Path
+from time import perf_counter
+
+from config import Config
+from phonebook import Phonebook
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Импорт записей из CSV-файла в телефонный справочник")
+    parser.add_argument("file", type=Path, help="CSV-файл с заголовком, содержащим названия полей справочника")
+    parser.add_argument("--delimiter", default=",", help="разделитель полей (по умолчанию -- запятая)")
+    args = parser.parse_args()
+
+    config = Config()
+    phonebook = Phonebook.from_config(config)
+
+    start = perf_counter()
+    with open(args.file, "r", encoding="utf-8", newline="") as f:
+        reader = DictReader(f, delimiter=args.delimiter)
+        if missing := set(phonebook.fieldnames[1:]) - set(reader.fieldnames or ()):
+            sys.exit(f"В файле '{args.file}' отсутствуют поля: {', '.join(sorted(missing))}")
+
+        # Values longer than a table column are rejected, just like when entered by hand
+        added, skipped = phonebook.add_many(reader, max_length=config.column_width)
+    elapsed = perf_counter() - start
+    phonebook.close()
+
+    print(f"Добавлено записей: {added}")
+    if skipped:
+        print(
+            f"Пропущено записей со значениями длиннее {config.column_width} символов или с управляющими символами: "
+            f"{skipped}"
+        )
+    print(f"Время: {elapsed:.2f} с ({(added + skipped) / elapsed if elapsed else 0:.0f} записей/с)")
+
+
+if __name__ == "__main__":
+    main()
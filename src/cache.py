@@ -0,0 +1,67 @@
+from collections import OrderedDict
+from collections.abc import Mapping
+
+from matching import make_matcher
+
+
+class SearchCache:
+    """LRU cache of search results. Entries that a changed record could affect are dropped."""
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        # (criteria, is_strict, is_case_sensitive) -> positions of matching records
+        self.entries: OrderedDict[tuple, list[int]] = OrderedDict()
+
+        # Counters to tune the capacity by
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(search_criteria: dict, is_strict: bool, is_case_sensitive: bool) -> tuple:
+        """Return cache key for already normalized criteria"""
+        return tuple(sorted(search_criteria.items())), is_strict, is_case_sensitive
+
+    def get(self, key: tuple) -> list[int] | None:
+        """Return cached positions or None"""
+        if (positions := self.entries.get(key)) is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return positions
+
+    def put(self, key: tuple, positions: list[int]) -> None:
+        """Cache positions, evicting the least recently used entry if the cache is full"""
+        self.entries[key] = positions
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, old_record: Mapping | None, new_record: Mapping) -> None:
+        """Drop entries whose result may change because a record was added (old_record is None) or edited"""
+        for key in list(self.entries):
+            criteria, is_strict, is_case_sensitive = key
+            matches = make_matcher(dict(criteria), is_strict, is_case_sensitive)
+            if matches(new_record) or (old_record is not None and matches(old_record)):
+                del self.entries[key]
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        """Drop all the entries"""
+        self.invalidations += len(self.entries)
+        self.entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Return the counters along with the current size"""
+        return {
+            "size": len(self.entries),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
@@ -1,6 +1,8 @@
 from pathlib import Path
 from configparser import ConfigParser
 
+from phonebook import Phonebook
+
 
 class Config(ConfigParser):
     """The class that contains and manipulates all settings"""
@@ -21,6 +23,20 @@ class Config(ConfigParser):
             self.add_section("Search")
             self.set("Search", "Strict", "False")
             self.set("Search", "CaseSensitive", "False")
+            self.set("Search", "Backend", "scan")
+            self.set("Search", "Workers", "0")
+            self.set("Search", "CacheSize", "128")
+            self.add_section("Storage")
+            self.set("Storage", "Layout", "rows")
+            self.set("Storage", "Journal", "False")
+            self.set("Storage", "CompactThreshold", "1000")
+            self.set("Storage", "Snapshot", "False")
+            self.add_section("Diagnostics")
+            self.set("Diagnostics", "Enabled", "False")
+            self.set("Diagnostics", "StatsFile", "diagnostics.txt")
+            self.set("Diagnostics", "Profiler", "none")
+            self.set("Diagnostics", "ProfileFile", "profile.out")
+            self.set("Diagnostics", "SampleInterval", "5")
 
             with open(file, "w", encoding="utf-8") as f:
                 self.write(f)
@@ -45,3 +61,64 @@ class Config(ConfigParser):
         # If True, the search is case-sensitive, otherwise it's not.
         # The default value is False.
         self.search_is_case_sensitive = self.getboolean("Search", "CaseSensitive", fallback=False)
+
+        # How the records are searched: "scan" checks every record, "index" uses hash and trigram indexes,
+        # "mmap" looks for the searched value in the raw bytes of the file, "parallel" splits the records
+        # between several processes. The default value is "scan".
+        self.search_backend = self.get("Search", "Backend", fallback="scan")
+        self.search_backend = self.search_backend if self.search_backend in Phonebook.search_backends else "scan"
+
+        # Number of processes used by the "parallel" search backend. 0 means the number of CPU cores.
+        # The default value is 0. The min value is 0.
+        self.search_workers = self.getint("Search", "Workers", fallback=0)
+        self.search_workers = max(self.search_workers, 0)
+
+        # Number of search results kept in the LRU cache. 0 disables the cache.
+        # The default value is 128. The min value is 0.
+        self.search_cache_size = self.getint("Search", "CacheSize", fallback=128)
+        self.search_cache_size = max(self.search_cache_size, 0)
+
+        # How the records are kept in memory: "rows" is a dict per record, "columns" is a column per field
+        # storing every distinct value once, "lazy" reads records from file when they are needed.
+        # The default value is "rows".
+        self.storage_layout = self.get("Storage", "Layout", fallback="rows")
+        self.storage_layout = self.storage_layout if self.storage_layout in Phonebook.layouts else "rows"
+
+        # If True, adds and edits are appended to a journal file instead of rewriting the CSV file.
+        # The default value is False.
+        self.storage_journal = self.getboolean("Storage", "Journal", fallback=False)
+
+        # Number of journal entries that triggers writing them into the CSV file.
+        # The default value is 1000. The min value is 1.
+        self.storage_compact_threshold = self.getint("Storage", "CompactThreshold", fallback=1000)
+        self.storage_compact_threshold = 1000 if self.storage_compact_threshold < 1 else self.storage_compact_threshold
+
+        # If True, a binary copy of the CSV file is kept next to it and loaded instead while the CSV file is unchanged.
+        # The default value is False.
+        self.storage_snapshot = self.getboolean("Storage", "Snapshot", fallback=False)
+
+        # If True, calls of Phonebook and Program methods are counted and timed, see Diagnostics.
+        # The default value is False.
+        self.diagnostics_enabled = self.getboolean("Diagnostics", "Enabled", fallback=False)
+
+        # File the stats are written to at exit, relative to the settings file.
+        # The default value is "diagnostics.txt".
+        self.diagnostics_stats_file = self.get("Diagnostics", "StatsFile", fallback="diagnostics.txt")
+        self.diagnostics_stats_file = self.file.parent / self.diagnostics_stats_file
+
+        # Profiler of the whole session: "none", "cprofile" (deterministic, the output is read with pstats)
+        # or "sampling" (takes the stack every SampleInterval, the output is in the collapsed stacks format).
+        # The default value is "none".
+        self.diagnostics_profiler = self.get("Diagnostics", "Profiler", fallback="none")
+        if self.diagnostics_profiler not in ("none", "cprofile", "sampling"):
+            self.diagnostics_profiler = "none"
+
+        # File the profile is written to at exit, relative to the settings file.
+        # The default value is "profile.out".
+        self.diagnostics_profile_file = self.get("Diagnostics", "ProfileFile", fallback="profile.out")
+        self.diagnostics_profile_file = self.file.parent / self.diagnostics_profile_file
+
+        # Interval between samples of the sampling profiler, in milliseconds (kept in seconds).
+        # The default value is 5. The min value is 1.
+        self.diagnostics_sample_interval = self.getint("Diagnostics", "SampleInterval", fallback=5)
+        self.diagnostics_sample_interval = max(self.diagnostics_sample_interval, 1) / 1000
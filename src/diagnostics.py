@@ -0,0 +1,255 @@
+import atexit
+import cProfile
+import sys
+import threading
+from bisect import bisect_left
+from collections import Counter
+from collections.abc import Callable
+from functools import wraps
+from pathlib import Path
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+from phonebook import Phonebook
+from program import Program
+from screen import Screen
+
+if TYPE_CHECKING:
+    from config import Config
+
+
+class CallStats:
+    """Number of calls of a method and a histogram of their durations"""
+
+    # Upper bounds of the histogram buckets in seconds: 1, 2, 5, 10, 20, 50 ... microseconds up to 50 seconds.
+    # The last bucket holds everything slower.
+    bounds = tuple(base * 10**power / 10**6 for power in range(8) for base in (1, 2, 5))
+
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(CallStats.bounds) + 1)
+
+    def add(self, duration: float) -> None:
+        self.count += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+        self.buckets[bisect_left(CallStats.bounds, duration)] += 1
+
+    def percentile(self, fraction: float) -> float:
+        """Return the upper bound of the bucket where the given fraction of calls falls (but not more than max)"""
+        rank = fraction * self.count
+        seen = 0
+        for i, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank and count:
+                return min(CallStats.bounds[i], self.max) if i < len(CallStats.bounds) else self.max
+        return self.max
+
+
+class SamplingProfiler:
+    """Takes the stack of a thread every interval and counts identical stacks.
+    The output is in the collapsed format ("outer;inner;innermost count") understood by flame graph tools."""
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.thread_id = threading.get_ident()
+        self.stacks: Counter[str] = Counter()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.__sample, name="SamplingProfiler", daemon=True)
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.stopped.set()
+        self.thread.join()
+
+    def dump(self, file: Path) -> None:
+        with open(file, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def __sample(self) -> None:
+        while not self.stopped.wait(self.interval):
+            if (frame := sys._current_frames().get(self.thread_id)) is None:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{Path(code.co_filename).name}:{code.co_name}")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(names))] += 1
+
+
+class Diagnostics:
+    """Counts calls and measures latency of the hot methods of Phonebook and Program, optionally profiling the session.
+
+    Methods are wrapped when it's started and restored when it's stopped, so they aren't timed unless it's enabled
+    in settings. Only the counters of checked records (last_scanned) are always kept by Phonebook and RecordIndex.
+    Stats are written to a file at exit.
+    """
+
+    # (class, attribute, name in stats)
+    targets = (
+        (Phonebook, "__init__", "Phonebook.load"),
+        (Phonebook, "add", "Phonebook.add"),
+        (Phonebook, "edit", "Phonebook.edit"),
+        (Phonebook, "add_many", "Phonebook.add_many"),
+        (Phonebook, "search", "Phonebook.search"),
+        (Phonebook, "refine", "Phonebook.refine"),
+        (Phonebook, "search_phone", "Phonebook.search_phone"),
+        (Phonebook, "compact", "Phonebook.compact"),
+        (Program, "_Program__render_table", "Program.render_table"),
+        (Screen, "clear", "Screen.clear"),
+        (Screen, "draw", "Screen.draw"),
+        (Program, "_Program__chunk_records", "Program.chunk_records"),
+    )
+    # Searches whose scanned and matched records are counted
+    searches = ("Phonebook.search", "Phonebook.refine")
+    profilers = ("none", "cprofile", "sampling")
+
+    def __init__(
+        self,
+        stats_file: Path,
+        profiler: str = "none",
+        profile_file: Path | None = None,
+        sample_interval: float = 0.005,
+    ) -> None:
+        if profiler not in Diagnostics.profilers:
+            raise ValueError(f"Unknown profiler: {profiler}")
+
+        self.stats_file = stats_file
+        self.profiler_name = profiler
+        self.profile_file = profile_file
+        self.sample_interval = sample_interval
+
+        self.calls: dict[str, CallStats] = {}
+        # Name of a search -> total numbers of records checked and found by it
+        self.scanned: Counter[str] = Counter()
+        self.matched: Counter[str] = Counter()
+        self.originals: list[tuple[type, str, object]] = []
+        # Phonebooks loaded while it's started, to report the counters of their search caches. The references are
+        # strong, as the stats are written at exit, when the phonebooks may be gone otherwise.
+        self.phonebooks: list[Phonebook] = []
+        self.profiler: cProfile.Profile | SamplingProfiler | None = None
+
+    @classmethod
+    def from_config(cls, config: "Config") -> "Diagnostics | None":
+        """Return diagnostics with the settings from config, or None if they are disabled"""
+        if not config.diagnostics_enabled:
+            return None
+        return cls(
+            config.diagnostics_stats_file,
+            profiler=config.diagnostics_profiler,
+            profile_file=config.diagnostics_profile_file,
+            sample_interval=config.diagnostics_sample_interval,
+        )
+
+    def start(self) -> None:
+        """Wrap the methods and start the profiler. Everything is stopped and written at exit."""
+        for cls, attribute, name in Diagnostics.targets:
+            original = cls.__dict__[attribute]
+            self.originals.append((cls, attribute, original))
+            if isinstance(original, staticmethod):
+                setattr(cls, attribute, staticmethod(self.__wrap(original.__func__, name)))
+            else:
+                setattr(cls, attribute, self.__wrap(original, name))
+
+        if self.profiler_name == "cprofile":
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        elif self.profiler_name == "sampling":
+            self.profiler = SamplingProfiler(self.sample_interval)
+            self.profiler.start()
+
+        atexit.register(self.stop)
+
+    def stop(self) -> None:
+        """Restore the methods, write the profile and the stats"""
+        atexit.unregister(self.stop)
+        if self.profiler is not None:
+            if isinstance(self.profiler, cProfile.Profile):
+                self.profiler.disable()
+                self.profiler.dump_stats(self.profile_file)
+            else:
+                self.profiler.stop()
+                self.profiler.dump(self.profile_file)
+            self.profiler = None
+
+        for cls, attribute, original in reversed(self.originals):
+            setattr(cls, attribute, original)
+        self.originals.clear()
+
+        with open(self.stats_file, "w", encoding="utf-8") as f:
+            f.write(self.report())
+
+    def report(self) -> str:
+        """Return the stats as text tables"""
+        lines = [
+            f"{'Метод':<28}{'вызовов':>10}{'всего, мс':>14}{'сред., мс':>12}{'p50, мс':>12}{'p99, мс':>12}"
+            f"{'макс., мс':>12}"
+        ]
+        calls = {name: stats for name, stats in sorted(self.calls.items()) if stats.count}
+        for name, stats in calls.items():
+            lines.append(
+                f"{name:<28}{stats.count:>10}{stats.total * 1000:>14.3f}{stats.total / stats.count * 1000:>12.3f}"
+                f"{stats.percentile(0.5) * 1000:>12.3f}{stats.percentile(0.99) * 1000:>12.3f}{stats.max * 1000:>12.3f}"
+            )
+
+        # Records found in the cache aren't checked, so more records can be found than checked
+        lines += ["", f"{'Поиск (в среднем)':<28}{'проверено':>14}{'найдено':>14}"]
+        for name in Diagnostics.searches:
+            if (stats := calls.get(name)) is None:
+                continue
+            scanned, matched = self.scanned[name] / stats.count, self.matched[name] / stats.count
+            lines.append(f"{name:<28}{scanned:>14.1f}{matched:>14.1f}")
+
+        if cached_phonebooks := [phonebook for phonebook in self.phonebooks if phonebook.cache is not None]:
+            lines += [
+                "",
+                f"{'Кеш поиска':<28}{'записей':>10}{'ёмкость':>10}{'попаданий':>12}{'промахов':>12}{'вытеснено':>12}"
+                f"{'сброшено':>12}{'попаданий, %':>14}",
+            ]
+            for phonebook in cached_phonebooks:
+                stats = phonebook.cache.stats()
+                lookups = stats["hits"] + stats["misses"]
+                hit_rate = stats["hits"] / lookups * 100 if lookups else 0
+                lines.append(
+                    f"{phonebook.file.name:<28}{stats['size']:>10}{stats['capacity']:>10}{stats['hits']:>12}{stats['misses']:>12}"
+                    f"{stats['evictions']:>12}{stats['invalidations']:>12}{hit_rate:>14.1f}"
+                )
+
+        lines += ["", "Гистограммы задержек (верхняя граница интервала, мс: вызовов)"]
+        for name, stats in calls.items():
+            buckets = [
+                f"{CallStats.bounds[i] * 1000:g}: {count}" if i < len(CallStats.bounds) else f"больше: {count}"
+                for i, count in enumerate(stats.buckets)
+                if count
+            ]
+            lines.append(f"{name}: {', '.join(buckets)}")
+        return "\n".join(lines) + "\n"
+
+    def __wrap(self, method: Callable, name: str) -> Callable:
+        """Return a method that records its calls under a name"""
+        stats = self.calls.setdefault(name, CallStats())
+        is_search = name in Diagnostics.searches
+
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                result = method(*args, **kwargs)
+            finally:
+                stats.add(perf_counter() - start)
+            if name == "Phonebook.load":
+                self.phonebooks.append(args[0])
+            elif is_search:
+                self.scanned[name] += args[0].last_scanned
+                self.matched[name] += len(result)
+            return result
+
+        return wrapper
@@ -0,0 +1,137 @@
+from collections.abc import Mapping, Sequence
+
+from matching import make_matcher
+
+
+class RecordIndex:
+    """Hash and trigram indexes over the records. Phonebook keeps it up to date on add/edit."""
+
+    def __init__(self, fieldnames: Sequence[str], records: Sequence[Mapping]) -> None:
+        self.fieldnames = tuple(fieldnames)
+        self.records = records
+
+        # Both kinds of indexes are keyed by (field, is_case_sensitive) and built on first use,
+        # so lowercased keys are only computed (once) if case-insensitive search is ever used.
+        # Exact index: field value -> positions of records having that value.
+        self.exact: dict[tuple[str, bool], dict[str, set[int]]] = {}
+        # Trigram index: trigram -> distinct field values containing it.
+        # Values are indexed instead of positions, as many of them repeat (e.g. organizations).
+        self.trigrams: dict[tuple[str, bool], dict[str, set[str]]] = {}
+        # Number of candidate records of the last search, i.e. the size of its most selective posting list
+        self.last_scanned = 0
+
+    def add(self, position: int, record: Mapping) -> None:
+        """Index a record appended to the records"""
+        for (field, is_case_sensitive), exact in self.exact.items():
+            key = record[field] if is_case_sensitive else record[field].lower()
+            self.__add_key(field, is_case_sensitive, exact, key, position)
+
+    def replace(self, position: int, old_record: Mapping, new_record: Mapping) -> None:
+        """Reindex a record that has been edited"""
+        for (field, is_case_sensitive), exact in self.exact.items():
+            old_key = old_record[field] if is_case_sensitive else old_record[field].lower()
+            new_key = new_record[field] if is_case_sensitive else new_record[field].lower()
+            if old_key == new_key:
+                continue
+
+            positions = exact[old_key]
+            positions.discard(position)
+            if not positions:
+                del exact[old_key]
+                if (trigrams := self.trigrams.get((field, is_case_sensitive))) is not None:
+                    for trigram in RecordIndex.split_trigrams(old_key):
+                        trigrams[trigram].discard(old_key)
+
+            self.__add_key(field, is_case_sensitive, exact, new_key, position)
+
+    def search(self, search_criteria: dict, is_strict: bool, is_case_sensitive: bool) -> list[int]:
+        """Return sorted positions of records matching already normalized criteria"""
+        if not search_criteria:
+            self.last_scanned = len(self.records)
+            return list(range(len(self.records)))
+
+        # Find matching keys first, it's cheap compared to merging their posting lists.
+        # Then process criteria from the most selective to the least one.
+        plans = []
+        for field, value in search_criteria.items():
+            exact = self.__get_exact(field, is_case_sensitive)
+            if is_strict:
+                keys = [value] if value in exact else []
+            else:
+                keys = self.__find_substring_keys(field, is_case_sensitive, value)
+            plans.append((sum(len(exact[key]) for key in keys), field, value, keys))
+        plans.sort(key=lambda plan: plan[0])
+        self.last_scanned = plans[0][0]
+
+        result: set[int] | None = None
+        for i, (size, field, value, keys) in enumerate(plans):
+            if result is not None and len(result) < size:
+                # Checking the remaining criteria record by record is cheaper than merging big posting lists
+                matches = make_matcher({plan[1]: plan[2] for plan in plans[i:]}, is_strict, is_case_sensitive)
+                result = {position for position in result if matches(self.records[position])}
+                break
+
+            exact = self.exact[(field, is_case_sensitive)]
+            postings = exact[keys[0]] if len(keys) == 1 else set().union(*(exact[key] for key in keys))
+            result = set(postings) if result is None else result & postings
+            if not result:
+                return []
+
+        return sorted(result)
+
+    @staticmethod
+    def split_trigrams(value: str) -> set[str]:
+        """Return all the 3-character substrings of a value"""
+        return {value[i : i + 3] for i in range(len(value) - 2)}
+
+    def __get_exact(self, field: str, is_case_sensitive: bool) -> dict[str, set[int]]:
+        """Return exact index for a field, building it if needed"""
+        if (exact := self.exact.get((field, is_case_sensitive))) is None:
+            # It's registered only once built, as add/replace would fail on a partial index of an unknown field
+            exact = {}
+            for position, record in enumerate(self.records):
+                key = record[field] if is_case_sensitive else record[field].lower()
+                if (positions := exact.get(key)) is None:
+                    exact[key] = {position}
+                else:
+                    positions.add(position)
+            self.exact[(field, is_case_sensitive)] = exact
+        return exact
+
+    def __get_trigrams(self, field: str, is_case_sensitive: bool) -> dict[str, set[str]]:
+        """Return trigram index for a field, building it if needed"""
+        if (trigrams := self.trigrams.get((field, is_case_sensitive))) is None:
+            trigrams = {}
+            for key in self.__get_exact(field, is_case_sensitive):
+                for trigram in RecordIndex.split_trigrams(key):
+                    trigrams.setdefault(trigram, set()).add(key)
+            self.trigrams[(field, is_case_sensitive)] = trigrams
+        return trigrams
+
+    def __find_substring_keys(self, field: str, is_case_sensitive: bool, value: str) -> list[str]:
+        """Return distinct indexed values containing the given one"""
+        if len(value) < 3:
+            # Too short to have a trigram, so just check every distinct value
+            return [key for key in self.__get_exact(field, is_case_sensitive) if value in key]
+
+        trigrams = self.__get_trigrams(field, is_case_sensitive)
+        candidate_sets = []
+        for trigram in RecordIndex.split_trigrams(value):
+            if not (candidates := trigrams.get(trigram)):
+                return []
+            candidate_sets.append(candidates)
+        candidate_sets.sort(key=len)
+
+        # Trigrams don't keep their order, so candidates still have to be verified
+        return [key for key in candidate_sets[0].intersection(*candidate_sets[1:]) if value in key]
+
+    def __add_key(self, field: str, is_case_sensitive: bool, exact: dict, key: str, position: int) -> None:
+        """Register a position under a key of an exact index (and trigram index if it's built)"""
+        if (positions := exact.get(key)) is not None:
+            positions.add(position)
+            return
+
+        exact[key] = {position}
+        if (trigrams := self.trigrams.get((field, is_case_sensitive))) is not None:
+            for trigram in RecordIndex.split_trigrams(key):
+                trigrams.setdefault(trigram, set()).add(key)
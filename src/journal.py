@@ -0,0 +1,57 @@
+from csv import reader, writer
+from collections.abc import MutableSequence, Sequence
+from io import StringIO
+from pathlib import Path
+
+
+class Journal:
+    """Append-only log of added and edited records. It's replayed over the CSV file on startup."""
+
+    def __init__(self, file: Path, fieldnames: Sequence[str]) -> None:
+        self.file = file
+        self.fieldnames = tuple(fieldnames)
+
+        # Number of entries and positions of records written since the last compaction
+        self.size = 0
+        self.positions: set[int] = set()
+
+    def replay(self, records: MutableSequence) -> None:
+        """Apply logged records on top of the ones loaded from the CSV file"""
+        if not self.file.exists():
+            return
+
+        with open(self.file, "rb") as f:
+            data = f.read()
+
+        # A write interrupted by a crash leaves a partial line at the end. Drop it,
+        # otherwise the next entry would be glued to it.
+        if (valid_length := data.rfind(b"\n") + 1) != len(data):
+            with open(self.file, "r+b") as f:
+                f.truncate(valid_length)
+
+        for row in reader(StringIO(data[:valid_length].decode("utf-8"), newline="")):
+            record = dict(zip(self.fieldnames, row))
+            # Entries carry the record ID, so replaying one twice (e.g. after a crash
+            # in the middle of compaction) doesn't change the result
+            position = int(record["ID"]) - 1
+            if position < len(records):
+                records[position] = record
+            else:
+                records.append(record)
+
+            self.size += 1
+            self.positions.add(position)
+
+    def append(self, record: dict) -> None:
+        """Log a new version of a record"""
+        with open(self.file, "a", encoding="utf-8", newline="") as f:
+            writer(f).writerow([record[name] for name in self.fieldnames])
+
+        self.size += 1
+        self.positions.add(int(record["ID"]) - 1)
+
+    def clear(self) -> None:
+        """Forget all the entries, once they are written to the CSV file"""
+        self.file.unlink(missing_ok=True)
+        self.size = 0
+        self.positions.clear()
@@ -0,0 +1,176 @@
+from array import array
+from collections.abc import Iterator, Mapping, Sequence
+from csv import reader
+from pathlib import Path
+from struct import Struct, error as StructError
+from typing import BinaryIO
+
+
+class LazyRecords(Sequence):
+    """Records read from the CSV file on demand. Rows are found by a sparse index of their byte offsets.
+
+    The index is kept in a sidecar file and rebuilt only if size or mtime of the CSV file change.
+    A record takes several lines if a quoted value has line breaks, its lines are told by the quotes being unbalanced.
+    """
+
+    # Offset of every `stride`-th row is stored, so the index is `stride` times smaller than the file has rows
+    stride = 64
+    # Magic, CSV file size, CSV file mtime (ns), stride, number of records
+    header = Struct("<8sQQQQ")
+    magic = b"PBIDX002"
+
+    def __init__(self, file: Path, fieldnames: Sequence[str]) -> None:
+        self.file = file
+        self.index_file = file.with_name(f"{file.name}.idx")
+        self.fieldnames = tuple(fieldnames)
+
+        self.offsets = array("Q")
+        self.indexed_count = 0
+        self.length = 0
+        # Records added or edited since the file was indexed, by position
+        self.overrides: dict[int, Mapping] = {}
+        self.f: BinaryIO | None = None
+
+        self.reload()
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, position: int | slice) -> Mapping | list[Mapping]:
+        if isinstance(position, slice):
+            start, stop, step = position.indices(self.length)
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return list(self.__read(start, stop, self.__get_file()))
+
+        if position < 0:
+            position += self.length
+        if not 0 <= position < self.length:
+            raise IndexError("record index out of range")
+        return next(self.__read(position, position + 1, self.__get_file()))
+
+    def __setitem__(self, position: int, record: Mapping) -> None:
+        self.overrides[position] = record
+
+    def __iter__(self) -> Iterator[Mapping]:
+        # Iteration gets its own file object, so random access in the meantime doesn't move its position
+        with open(self.file, "rb") as f:
+            yield from self.__read(0, self.length, f)
+
+    def append(self, record: Mapping) -> None:
+        """Add a record to the end. It's kept in memory until the file is reloaded."""
+        self.overrides[self.length] = record
+        self.length += 1
+
+    def reload(self) -> None:
+        """Forget changes made in memory and reopen the file, rebuilding its index if it's outdated"""
+        self.close()
+
+        stat = self.file.stat()
+        if not self.__load_index(stat.st_size, stat.st_mtime_ns):
+            self.__build_index(stat.st_size, stat.st_mtime_ns)
+
+        self.length = self.indexed_count
+        self.overrides.clear()
+
+    def close(self) -> None:
+        """Close the file"""
+        if self.f is not None:
+            self.f.close()
+            self.f = None
+
+    def __get_file(self) -> BinaryIO:
+        """Return the file object used for random access, opening it if needed"""
+        if self.f is None:
+            self.f = open(self.file, "rb")
+        return self.f
+
+    def __read(self, start: int, stop: int, f: BinaryIO) -> Iterator[Mapping]:
+        """Yield records in the given range, reading consecutive rows from a single file position"""
+        position = start
+        if position < self.indexed_count:
+            # Seek to the closest indexed row, then skip the rows preceding the wanted one
+            f.seek(self.offsets[position // self.stride])
+            skip = position % self.stride
+            for lines in self.__iter_rows(f):
+                if skip:
+                    skip -= 1
+                    continue
+                if position >= min(stop, self.indexed_count):
+                    break
+
+                if (record := self.overrides.get(position)) is None:
+                    row = next(reader(line.decode("utf-8") for line in lines))
+                    record = dict(zip(self.fieldnames, row))
+                yield record
+                position += 1
+
+        while position < stop:
+            yield self.overrides[position]
+            position += 1
+
+    def __load_index(self, size: int, mtime_ns: int) -> bool:
+        """Read the index from the sidecar file. Return False if it's missing or outdated."""
+        try:
+            with open(self.index_file, "rb") as f:
+                magic, indexed_size, indexed_mtime_ns, stride, count = LazyRecords.header.unpack(
+                    f.read(LazyRecords.header.size)
+                )
+                if (magic, stride) != (LazyRecords.magic, self.stride):
+                    return False
+                if (indexed_size, indexed_mtime_ns) != (size, mtime_ns):
+                    return False
+
+                offsets = array("Q")
+                offsets.frombytes(f.read())
+        except (OSError, StructError):
+            return False
+
+        self.offsets = offsets
+        self.indexed_count = count
+        return True
+
+    def __build_index(self, size: int, mtime_ns: int) -> None:
+        """Scan the file for row offsets and save them to the sidecar file"""
+        offsets = array("Q")
+        count = 0
+        # Number of quotes in the row being read, it goes on in the next line while it's odd. See __iter_rows().
+        quotes = 0
+        with open(self.file, "rb") as f:
+            offset = len(f.readline())  # The header
+            for line in f:
+                if quotes % 2:
+                    quotes += line.count(b'"')
+                elif line.strip():
+                    if count % self.stride == 0:
+                        offsets.append(offset)
+                    count += 1
+                    quotes = line.count(b'"')
+                offset += len(line)
+
+        self.offsets = offsets
+        self.indexed_count = count
+
+        try:
+            with open(self.index_file, "wb") as f:
+                f.write(LazyRecords.header.pack(LazyRecords.magic, size, mtime_ns, self.stride, count))
+                f.write(offsets.tobytes())
+        except OSError:
+            # The index works without the sidecar file, it's just rebuilt on the next start
+            pass
+
+    @staticmethod
+    def __iter_rows(f: BinaryIO) -> Iterator[list[bytes]]:
+        """Yield the lines of every row from the current file position, skipping blank lines"""
+        lines, quotes = [], 0
+        for line in f:
+            if lines or line.strip():
+                lines.append(line)
+                quotes += line.count(b'"')
+                # An odd number of quotes means a quoted value goes on in the next line
+                if quotes % 2 == 0:
+                    yield lines
+                    lines, quotes = [], 0
+        if lines:
+            # A quoted value isn't closed at the end of the file
+            yield lines
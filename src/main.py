@@ -1,5 +1,11 @@
-from sys import version_info
+import os
+from argparse import ArgumentParser, BooleanOptionalAction, FileType
+from sys import stdout, version_info
 
+from batch import run_batch
+from config import Config
+from diagnostics import Diagnostics
+from phonebook import Phonebook
 from program import Program
 
 
@@ -13,9 +19,55 @@ def main() -> None:
             "Нажмите Enter для выхода из программы..."
         )
         Program.clear_screen()
-    else:
-        program = Program()
+        return
+
+    parser = ArgumentParser(description="Телефонный справочник")
+    parser.add_argument(
+        "--batch",
+        nargs="?",
+        const="-",
+        # Opened right away, so a missing file is reported before the phonebook is loaded
+        type=FileType("r", encoding="utf-8"),
+        metavar="FILE",
+        help="выполнить запросы вида 'поле=значение; поле=значение' из файла (или stdin) без интерактивного меню",
+    )
+    parser.add_argument("--format", choices=("csv", "jsonl"), default="csv", help="формат вывода найденных записей")
+    parser.add_argument("--strict", action=BooleanOptionalAction, help="строгий поиск (по умолчанию -- из настроек)")
+    parser.add_argument(
+        "--case-sensitive", action=BooleanOptionalAction, help="поиск с учетом регистра (по умолчанию -- из настроек)"
+    )
+    parser.add_argument("--verbose", action="store_true", help="выводить время выполнения каждого запроса")
+    args = parser.parse_args()
+
+    config = Config()
+    if (diagnostics := Diagnostics.from_config(config)) is not None:
+        diagnostics.start()
+
+    if args.batch is None:
+        program = Program(config)
         program.run()
+        return
+
+    # Headless mode: no menus, results go to stdout, stats go to stderr
+    phonebook = Phonebook.from_config(config)
+    lines = args.batch
+    is_strict = config.search_is_strict if args.strict is None else args.strict
+    is_case_sensitive = config.search_is_case_sensitive if args.case_sensitive is None else args.case_sensitive
+    try:
+        with lines:
+            run_batch(
+                phonebook,
+                lines,
+                stdout,
+                args.format,
+                is_strict,
+                is_case_sensitive,
+                verbose=args.verbose,
+            )
+    except BrokenPipeError:
+        # The reader of the output (e.g. `head`) exited early. Silence the flush at exit.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), stdout.fileno())
+    phonebook.close()
 
 
 if __name__ == "__main__":
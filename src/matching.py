@@ -0,0 +1,36 @@
+from collections.abc import Callable, Mapping
+
+
+def normalize_criteria(search_criteria: Mapping, is_case_sensitive: bool) -> dict[str, str]:
+    """Remove pairs with None and "" values, taking the case sensitivity flag into account"""
+    if is_case_sensitive:
+        return {k: v for k, v in search_criteria.items() if v}
+    return {k: v.lower() for k, v in search_criteria.items() if v}
+
+
+def make_matcher(search_criteria: dict, is_strict: bool, is_case_sensitive: bool) -> Callable[[Mapping], bool]:
+    """Return a predicate telling if a record matches already normalized criteria"""
+    criteria = tuple(search_criteria.items())
+
+    if is_strict:
+        # Use `==` to compare records
+        if is_case_sensitive:
+            return lambda record: all(value == record[key] for key, value in criteria)
+        return lambda record: all(value == record[key].lower() for key, value in criteria)
+
+    # Use `in` to compare records
+    if is_case_sensitive:
+        return lambda record: all(value in record[key] for key, value in criteria)
+    return lambda record: all(value in record[key].lower() for key, value in criteria)
+
+
+def make_value_matcher(value: str, is_strict: bool, is_case_sensitive: bool) -> Callable[[str], bool]:
+    """Return a predicate telling if a single field value matches an already normalized criterion"""
+    if is_strict:
+        if is_case_sensitive:
+            return lambda field_value: value == field_value
+        return lambda field_value: value == field_value.lower()
+
+    if is_case_sensitive:
+        return lambda field_value: value in field_value
+    return lambda field_value: value in field_value.lower()
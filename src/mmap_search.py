@@ -0,0 +1,112 @@
+import re
+from collections.abc import Sequence
+from csv import reader
+from functools import cache
+from mmap import mmap, ACCESS_READ
+from pathlib import Path
+
+from matching import make_matcher
+
+# Characters lowering to a letter that are neither its uppercase nor titlecase form, e.g. the Kelvin sign
+EXTRA_UPPERCASE_VARIANTS = {"θ": "\u03f4", "ß": "\u1e9e", "ω": "\u2126", "k": "\u212a", "å": "\u212b"}
+
+
+@cache
+def get_uppercase_variants(char: str) -> tuple[str, ...]:
+    """Return characters turning into a given one when lowercased, e.g. "д" -> ("Д",), "k" -> ("K", "K")"""
+    candidates = dict.fromkeys((char.upper(), char.title(), *EXTRA_UPPERCASE_VARIANTS.get(char, "")))
+    return tuple(c for c in candidates if len(c) == 1 and c != char and c.lower() == char)
+
+
+class MmapSearcher:
+    """Searches the bytes of the CSV file directly. Only lines containing the searched value are decoded."""
+
+    def __init__(self, file: Path, fieldnames: Sequence[str]) -> None:
+        self.file = file
+        self.fieldnames = tuple(fieldnames)
+
+        # Row positions are counted by line breaks, so blank lines (skipped when loading the file) and rows taking
+        # several lines (a quoted value with a line break) break them. Whether there are any is cached by size
+        # and mtime of the file.
+        self.checked_stat: tuple[int, int] | None = None
+        self.has_irregular_lines = False
+
+    def search(self, search_criteria: dict, is_strict: bool, is_case_sensitive: bool) -> list[int] | None:
+        """Return positions of records in file matching already normalized criteria.
+        Return None if the file can't be searched this way."""
+        matches = make_matcher(search_criteria, is_strict, is_case_sensitive)
+        # The longest value is likely to be the rarest one. Any line it isn't found in can't match.
+        value = max(search_criteria.values(), key=len)
+        # Values with quotes are written quoted, with quotes doubled
+        value = value.replace('"', '""')
+        if is_case_sensitive or value.upper() == value:
+            pattern = re.compile(re.escape(value.encode("utf-8")))
+        else:
+            pattern = MmapSearcher.compile_case_insensitive(value)
+
+        result = []
+        if self.file.stat().st_size == 0:
+            return result
+
+        with open(self.file, "rb") as f, mmap(f.fileno(), 0, access=ACCESS_READ) as data:
+            if not self.__check_lines(data):
+                return None
+
+            rows_start = data.find(b"\n") + 1
+            position, counted_until = 0, rows_start
+            while match := pattern.search(data, counted_until):
+                line_start = data.rfind(b"\n", 0, match.start()) + 1
+                if (line_end := data.find(b"\n", match.end())) == -1:
+                    line_end = len(data)
+                if line_start < rows_start:
+                    # Found in the header
+                    counted_until = rows_start
+                    continue
+
+                position += MmapSearcher.count_lines(data, counted_until, line_start)
+                row = next(reader([data[line_start:line_end].decode("utf-8")]))
+                if matches(dict(zip(self.fieldnames, row))):
+                    result.append(position)
+
+                position += 1
+                counted_until = line_end + 1
+
+        return result
+
+    @staticmethod
+    def count_lines(data: mmap, start: int, end: int, chunk_size: int = 1 << 20) -> int:
+        """Return the number of line breaks in data[start:end]. Copies at most `chunk_size` bytes at once."""
+        return sum(data[i : min(i + chunk_size, end)].count(b"\n") for i in range(start, end, chunk_size))
+
+    @staticmethod
+    def compile_case_insensitive(value: str) -> re.Pattern:
+        """Return a bytes pattern matching any string that becomes `value` when lowercased.
+        Casing rules of Unicode are followed, so it works for Cyrillic unlike re.IGNORECASE on bytes."""
+        parts = []
+        for char in value:
+            alternatives = [char, *get_uppercase_variants(char)]
+            parts.append(b"(?:" + b"|".join(re.escape(c.encode("utf-8")) for c in alternatives) + b")")
+        return re.compile(b"".join(parts))
+
+    @staticmethod
+    def has_multiline_rows(data: mmap) -> bool:
+        """Tell if a quoted value has a line break. Its first line has an odd number of quotes then."""
+        position = data.find(b'"')
+        while position != -1:
+            line_start = data.rfind(b"\n", 0, position) + 1
+            if (line_end := data.find(b"\n", position)) == -1:
+                line_end = len(data)
+            if data[line_start:line_end].count(b'"') % 2:
+                return True
+            position = data.find(b'"', line_end)
+        return False
+
+    def __check_lines(self, data: mmap) -> bool:
+        """Return True if row positions can be counted by line breaks"""
+        stat = self.file.stat()
+        if self.checked_stat != (stat.st_size, stat.st_mtime_ns):
+            self.has_irregular_lines = (
+                data.find(b"\n\n") != -1 or data.find(b"\n\r\n") != -1 or MmapSearcher.has_multiline_rows(data)
+            )
+            self.checked_stat = (stat.st_size, stat.st_mtime_ns)
+        return not self.has_irregular_lines
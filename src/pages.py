@@ -0,0 +1,20 @@
+from collections.abc import Sequence
+
+
+class Pages(Sequence):
+    """Records split into equally sized pages (the last one may vary). A page is sliced only when accessed."""
+
+    def __init__(self, records: Sequence, records_per_page: int) -> None:
+        self.records = records
+        self.records_per_page = records_per_page
+
+    def __len__(self) -> int:
+        # There is always at least one page, even if it's an empty one
+        return max(1, -(-len(self.records) // self.records_per_page))
+
+    def __getitem__(self, index: int) -> Sequence:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("page index out of range")
+        return self.records[index * self.records_per_page : (index + 1) * self.records_per_page]
@@ -0,0 +1,120 @@
+import os
+import sys
+from bisect import bisect_right
+from collections.abc import Mapping, Sequence
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+from lazy import LazyRecords
+from matching import make_matcher
+
+# State of a worker process: position of the first record of its shard and values of the shard records
+shard_start = 0
+shard_rows: list[tuple[str, ...]] = []
+
+
+def init_worker(start: int, rows: list[tuple[str, ...]]) -> None:
+    """Keep a shard of records in a worker process"""
+    global shard_start, shard_rows
+    shard_start, shard_rows = start, rows
+
+
+def search_shard(search_criteria: dict, is_strict: bool, is_case_sensitive: bool) -> list[int]:
+    """Return positions of records of the worker's shard matching criteria keyed by field number"""
+    matches = make_matcher(search_criteria, is_strict, is_case_sensitive)
+    return [shard_start + i for i, row in enumerate(shard_rows) if matches(row)]
+
+
+def set_row(position: int, row: tuple[str, ...]) -> None:
+    """Update (or append) a record of the worker's shard"""
+    if (i := position - shard_start) < len(shard_rows):
+        shard_rows[i] = row
+    else:
+        shard_rows.append(row)
+
+
+def is_gil_enabled() -> bool:
+    """Tell if threads can't run Python code in parallel"""
+    return getattr(sys, "_is_gil_enabled", lambda: True)()
+
+
+class ParallelSearcher:
+    """Searches shards of the records in parallel. Each shard stays in its own worker process,
+    so searching doesn't send the records anywhere. On free-threaded builds threads are used instead."""
+
+    def __init__(self, fieldnames: Sequence[str], records: Sequence[Mapping], workers: int = 0) -> None:
+        self.fieldnames = tuple(fieldnames)
+        self.records = records
+        self.workers = workers or os.cpu_count() or 1
+        # LazyRecords share a file object for random access, so they can't be read by several threads
+        self.use_threads = not is_gil_enabled() and not isinstance(records, LazyRecords)
+
+        # Workers are started by the first search
+        self.shard_starts: list[int] = []
+        self.executors: list[ProcessPoolExecutor | ThreadPoolExecutor] = []
+        # Shard updates sent to worker processes. They are checked for errors before searching.
+        self.pending_updates: list[Future] = []
+
+    def search(self, search_criteria: dict, is_strict: bool, is_case_sensitive: bool) -> list[int]:
+        """Return sorted positions of records matching already normalized criteria"""
+        if not self.executors:
+            self.__start()
+
+        if self.use_threads:
+            matches = make_matcher(search_criteria, is_strict, is_case_sensitive)
+            bounds = [*self.shard_starts, len(self.records)]
+            futures = [
+                self.executors[0].submit(self.__search_range, matches, start, stop)
+                for start, stop in zip(bounds, bounds[1:])
+            ]
+        else:
+            for future in self.pending_updates:
+                future.result()
+            self.pending_updates.clear()
+
+            # Workers keep records as tuples, so fields are referred to by their numbers
+            criteria = {self.fieldnames.index(key): value for key, value in search_criteria.items()}
+            futures = [
+                executor.submit(search_shard, criteria, is_strict, is_case_sensitive) for executor in self.executors
+            ]
+
+        # Shards are in ID order, so concatenated results are too
+        return [position for future in futures for position in future.result()]
+
+    def set(self, position: int, record: Mapping) -> None:
+        """Pass an added or edited record to the worker holding it"""
+        if not self.executors or self.use_threads:
+            # Threads search the records themselves
+            return
+
+        row = tuple(record[name] for name in self.fieldnames)
+        executor = self.executors[bisect_right(self.shard_starts, position) - 1]
+        self.pending_updates.append(executor.submit(set_row, position, row))
+
+    def close(self) -> None:
+        """Stop the workers"""
+        for executor in self.executors:
+            executor.shutdown()
+        self.executors.clear()
+        self.shard_starts.clear()
+        self.pending_updates.clear()
+
+    def __start(self) -> None:
+        """Split the records into shards and start the workers"""
+        shard_size = max(1, -(-len(self.records) // self.workers))
+        self.shard_starts = list(range(0, len(self.records), shard_size)) or [0]
+
+        if self.use_threads:
+            self.executors = [ThreadPoolExecutor(self.workers)]
+            return
+
+        # Records are sent to a worker once, when it starts. New records go to the last shard.
+        rows = [tuple(record[name] for name in self.fieldnames) for record in self.records]
+        for start in self.shard_starts:
+            self.executors.append(
+                ProcessPoolExecutor(1, initializer=init_worker, initargs=(start, rows[start : start + shard_size]))
+            )
+
+    def __search_range(self, matches, start: int, stop: int) -> list[int]:
+        """Return positions of matching records in the given range. Used by threads."""
+        records = self.records
+        return [position for position in range(start, stop) if matches(records[position])]
@@ -0,0 +1,97 @@
+import re
+from bisect import bisect_left, insort
+from collections.abc import Mapping, Sequence
+
+non_digits = re.compile(r"[^0-9]")
+
+
+def normalize_phone(value: str) -> str:
+    """Keep digits only, so that "+7 (957) 386-03-58", "8 957 386 03 58" and "+79573860358" give the same key"""
+    digits = non_digits.sub("", value)
+    # Russian numbers are written with the trunk prefix 8 as often as with +7
+    if len(digits) == 11 and digits.startswith("8") and not value.lstrip().startswith("+"):
+        digits = "7" + digits[1:]
+    return digits
+
+
+class PhoneIndex:
+    """Sorted digits-only keys of phone numbers, for exact, prefix and suffix lookups by bisection.
+    Phonebook keeps it up to date on add/edit."""
+
+    modes = ("exact", "prefix", "suffix")
+
+    def __init__(self, fields: Sequence[str], records: Sequence[Mapping]) -> None:
+        self.fields = tuple(fields)
+        self.records = records
+
+        # Both are built on first use. Keys are sorted (key, position) pairs, per field.
+        # Suffixes are looked up as prefixes of reversed keys.
+        self.keys: dict[str, list[tuple[str, int]]] = {}
+        self.reversed_keys: dict[str, list[tuple[str, int]]] = {}
+
+    def add(self, position: int, record: Mapping) -> None:
+        """Index a record appended to the records"""
+        if self.keys:
+            for field in self.fields:
+                key = normalize_phone(record[field])
+                insort(self.keys[field], (key, position))
+                insort(self.reversed_keys[field], (key[::-1], position))
+
+    def replace(self, position: int, old_record: Mapping, new_record: Mapping) -> None:
+        """Reindex a record that has been edited"""
+        if self.keys:
+            for field in self.fields:
+                old_key, new_key = normalize_phone(old_record[field]), normalize_phone(new_record[field])
+                if old_key != new_key:
+                    for keys, old, new in (
+                        (self.keys[field], old_key, new_key),
+                        (self.reversed_keys[field], old_key[::-1], new_key[::-1]),
+                    ):
+                        del keys[bisect_left(keys, (old, position))]
+                        insort(keys, (new, position))
+
+    def reset(self) -> None:
+        """Drop the keys, so that they are built anew on the next lookup"""
+        self.keys.clear()
+        self.reversed_keys.clear()
+
+    def find(self, number: str, mode: str = "prefix", fields: Sequence[str] | None = None) -> list[int]:
+        """Return sorted positions of records having a phone number that equals, starts or ends with the given one"""
+        if mode not in PhoneIndex.modes:
+            raise ValueError(f"Unknown mode: {mode}")
+        if not (key := normalize_phone(number)):
+            return []
+        if not self.keys:
+            self.__build()
+
+        # (key, whether found keys must be or must not be 11 digits long, or None if it doesn't matter)
+        lookups = [(key[::-1] if mode == "suffix" else key, None)]
+        digits = non_digits.sub("", number)
+        if mode == "prefix" and digits.startswith("8") and not number.lstrip().startswith("+"):
+            # Stored numbers are normalized as a whole: 8 is only replaced in 11-digit ones, see normalize_phone()
+            lookups = [(digits, False), ("7" + digits[1:], True)]
+
+        positions = set()
+        for field in fields or self.fields:
+            keys = self.reversed_keys[field] if mode == "suffix" else self.keys[field]
+            for key, is_eleven_digits in lookups:
+                i = bisect_left(keys, (key,))
+                while i < len(keys) and (keys[i][0] == key if mode == "exact" else keys[i][0].startswith(key)):
+                    if is_eleven_digits is None or (len(keys[i][0]) == 11) == is_eleven_digits:
+                        positions.add(keys[i][1])
+                    i += 1
+        return sorted(positions)
+
+    def __build(self) -> None:
+        """Index all the records"""
+        for field in self.fields:
+            self.keys[field] = []
+            self.reversed_keys[field] = []
+        for position, record in enumerate(self.records):
+            for field in self.fields:
+                key = normalize_phone(record[field])
+                self.keys[field].append((key, position))
+                self.reversed_keys[field].append((key[::-1], position))
+        for field in self.fields:
+            self.keys[field].sort()
+            self.reversed_keys[field].sort()
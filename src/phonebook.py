@@ -1,60 +1,406 @@
+import os
+import re
+from collections.abc import Iterable, Mapping
 from pathlib import Path
-from csv import DictReader, DictWriter
+from csv import DictReader, DictWriter, reader
+from typing import TYPE_CHECKING
+
+from cache import SearchCache
+from index import RecordIndex
+from journal import Journal
+from lazy import LazyRecords
+from mmap_search import MmapSearcher
+from parallel import ParallelSearcher
+from phone_index import PhoneIndex
+from matching import make_matcher, normalize_criteria
+from snapshot import Snapshot
+from sorting import Ordering, SortedRecords
+from store import ColumnarRecords
+
+if TYPE_CHECKING:
+    from config import Config
+
+# Characters that input() never returns. A line break would make a record take several lines of the file.
+control_characters = re.compile(r"[\x00-\x1f\x7f]")
 
 
 class Phonebook:
     """The class that contains and manipulates all records"""
 
-    def __init__(self, file_path: Path = Path(__file__).resolve().parent.parent / "phonebook.csv") -> None:
+    search_backends = ("scan", "index", "mmap", "parallel")
+    layouts = ("rows", "columns", "lazy")
+
+    def __init__(
+        self,
+        file_path: Path = Path(__file__).resolve().parent.parent / "phonebook.csv",
+        search_backend: str = "scan",
+        search_workers: int = 0,
+        cache_size: int = 0,
+        layout: str = "rows",
+        use_journal: bool = False,
+        compact_threshold: int = 1000,
+        use_snapshot: bool = False,
+    ) -> None:
+        if search_backend not in Phonebook.search_backends:
+            raise ValueError(f"Unknown search backend: {search_backend}")
+        if layout not in Phonebook.layouts:
+            raise ValueError(f"Unknown layout: {layout}")
+
         self.fieldnames = ("ID", "Имя", "Отчество", "Фамилия", "Организация", "Рабочий телефон", "Личный телефон")
-        self.records: list[dict] = []
+        # Records are either dicts in memory, columns of ColumnarRecords giving dict-like views of them
+        # or LazyRecords reading them from file on demand
+        self.records: list[dict] | ColumnarRecords | LazyRecords = []
+        if layout == "columns":
+            self.records = ColumnarRecords(self.fieldnames)
 
         self.file = file_path
         self.file_not_found = not self.file.exists()
 
+        # Optional binary copy of the file loaded instead of it while it's unchanged, see Snapshot.
+        # The file changed by add/edit makes it outdated, so it's written anew when the file is rewritten.
+        self.snapshot = None
+        if use_snapshot and layout != "lazy":
+            self.snapshot = Snapshot(self.file.with_name(f"{self.file.name}.snap"), self.fieldnames)
+
+        is_snapshot_loaded = False
         if self.file_not_found:
             with open(self.file, "w", encoding="utf-8", newline="") as f:
                 writer = DictWriter(f, fieldnames=self.fieldnames)
                 writer.writeheader()
-        else:
+        elif self.snapshot is not None and (columns := self.snapshot.load(self.file)) is not None:
+            if layout == "columns":
+                self.records.extend_rows(zip(*columns))
+            else:
+                self.records = [dict(zip(self.fieldnames, row)) for row in zip(*columns)]
+            is_snapshot_loaded = True
+        elif layout == "columns":
             with open(self.file, "r", encoding="utf-8", newline="") as f:
-                reader = DictReader(f)
-                self.records = list(reader)
+                rows = reader(f)
+                header = next(rows, self.fieldnames)
+                if tuple(header) != self.fieldnames:
+                    # Put the values in fieldnames order if columns in file are shuffled
+                    order = [header.index(name) for name in self.fieldnames]
+                    rows = ([row[i] for i in order] for row in rows)
+                self.records.extend_rows(rows)
+        elif layout == "rows":
+            with open(self.file, "r", encoding="utf-8", newline="") as f:
+                self.records = list(DictReader(f))
+
+        if layout == "lazy":
+            self.records = LazyRecords(self.file, self.fieldnames)
+        elif self.snapshot is not None and not is_snapshot_loaded:
+            self.__save_snapshot()
+
+        # Adds and edits are appended to the journal instead of touching the CSV file
+        # if it's enabled. The CSV file is brought up to date by compaction.
+        self.use_journal = use_journal
+        self.compact_threshold = compact_threshold
+        self.journal = Journal(self.file.with_name(f"{self.file.name}.journal"), self.fieldnames)
+        self.journal.replay(self.records)
+        if self.journal.size and not self.use_journal:
+            self.compact()
+
+        # Optional indexes maintained alongside the records, see RecordIndex
+        self.index = RecordIndex(self.fieldnames, self.records) if search_backend == "index" else None
+        # Optional search over the raw bytes of the file, see MmapSearcher
+        self.mmap_searcher = MmapSearcher(self.file, self.fieldnames) if search_backend == "mmap" else None
+        # Optional search in several processes, see ParallelSearcher
+        self.parallel_searcher = None
+        if search_backend == "parallel":
+            self.parallel_searcher = ParallelSearcher(self.fieldnames, self.records, search_workers)
+
+        # Digits-only keys of phone numbers for search_phone(), built on its first call
+        self.phone_index = PhoneIndex(self.fieldnames[-2:], self.records)
+
+        # Orderings of the records by fields, made by sorted_by() and kept up to date on add/edit
+        self.orderings: dict[tuple[str, ...], Ordering] = {}
+
+        # Optional cache of search results, see SearchCache
+        self.cache = SearchCache(cache_size) if cache_size > 0 else None
+
+        # Incremented by every add/edit, so that results of an older search are known to be outdated
+        self.generation = 0
+        # Normalized criteria, flags, generation and found positions of the last search, used by refine()
+        self.last_search: tuple[dict, bool, bool, int, list[int]] | None = None
+        # Number of records checked by the last search: 0 if it's answered from the cache, candidates of the index
+        # or all the records for the other backends. It's only read by Diagnostics.
+        self.last_scanned = 0
+
+    @classmethod
+    def from_config(cls, config: "Config") -> "Phonebook":
+        """Open the default DB file with the settings from config"""
+        return cls(
+            search_backend=config.search_backend,
+            search_workers=config.search_workers,
+            cache_size=config.search_cache_size,
+            layout=config.storage_layout,
+            use_journal=config.storage_journal,
+            compact_threshold=config.storage_compact_threshold,
+            use_snapshot=config.storage_snapshot,
+        )
 
     def add(self, record: dict) -> None:
         """Add new record to DB and file"""
+        self.__validate(record)
+        # The record is written first, so that a failed write leaves the records and indexes as they were
+        if self.use_journal:
+            self.journal.append(record)
+        else:
+            with open(self.file, "a", encoding="utf-8", newline="") as f:
+                writer = DictWriter(f, fieldnames=self.fieldnames)
+                writer.writerow(record)
+
+        if self.cache is not None:
+            self.cache.invalidate(None, record)
+        self.generation += 1
         self.records.append(record)
-        with open(self.file, "a", encoding="utf-8", newline="") as f:
-            writer = DictWriter(f, fieldnames=self.fieldnames)
-            writer.writerow(record)
+        if self.index is not None:
+            self.index.add(len(self.records) - 1, record)
+        self.phone_index.add(len(self.records) - 1, record)
+        for ordering in self.orderings.values():
+            ordering.add(len(self.records) - 1, record)
+        if self.parallel_searcher is not None:
+            self.parallel_searcher.set(len(self.records) - 1, record)
+
+        if self.use_journal and self.journal.size >= self.compact_threshold:
+            self.compact()
 
     def edit(self, record_id: int, record: dict) -> None:
-        """Modify a DB record. Write updated DB to file."""
-        self.records[record_id - 1] = record
-        with open(self.file, "w", encoding="utf-8", newline="") as f:
-            writer = DictWriter(f, fieldnames=self.fieldnames)
-            writer.writeheader()
-            writer.writerows(self.records)
+        """Modify a DB record. Write it to the journal or the whole updated DB to file."""
+        self.__validate(record)
+        position = record_id - 1
+        old_record = self.records[position]
+        if self.use_journal:
+            self.journal.append(record)
+        else:
+            # The file is written from the records, so the old record is put back if writing fails
+            self.records[position] = record
+            try:
+                self.__rewrite()
+            except BaseException:
+                self.records[position] = old_record
+                raise
+
+        if self.cache is not None:
+            self.cache.invalidate(old_record, record)
+        self.generation += 1
+        if self.index is not None:
+            self.index.replace(position, old_record, record)
+        self.phone_index.replace(position, old_record, record)
+        for ordering in self.orderings.values():
+            ordering.replace(position, record)
+        self.records[position] = record
+        if self.parallel_searcher is not None:
+            self.parallel_searcher.set(position, record)
+
+        if self.use_journal and self.journal.size >= self.compact_threshold:
+            self.compact()
+
+    def add_many(
+        self, records: Iterable[Mapping], max_length: int | None = None, batch_size: int = 10_000
+    ) -> tuple[int, int]:
+        """Add many records to DB and file at once. IDs are assigned sequentially, IDs of given records are ignored.
+        Records having a value longer than max_length or with control characters (e.g. line breaks) are skipped.
+        Return numbers of added and skipped records."""
+        if self.journal.size:
+            # Logged records have to get to the file before the new ones are appended to it
+            self.compact()
+
+        # LazyRecords would keep every new record in memory, so they are reread from file instead
+        is_lazy = isinstance(self.records, LazyRecords)
+        position = len(self.records)
+        added = skipped = 0
+        batch = []
+        try:
+            with open(self.file, "a", encoding="utf-8", newline="", buffering=1 << 20) as f:
+                writer = DictWriter(f, fieldnames=self.fieldnames)
+                for record in records:
+                    values = [(record.get(name) or "").strip() for name in self.fieldnames[1:]]
+                    if any(control_characters.search(value) for value in values) or (
+                        max_length is not None and any(len(value) > max_length for value in values)
+                    ):
+                        skipped += 1
+                        continue
+
+                    batch.append(dict(zip(self.fieldnames, (f"{position + added + len(batch) + 1}", *values))))
+                    if len(batch) >= batch_size:
+                        self.__append_batch(writer, batch, is_lazy)
+                        added += len(batch)
+                        batch.clear()
+                self.__append_batch(writer, batch, is_lazy)
+                added += len(batch)
+        finally:
+            # Records of a batch get into memory only once it's written, so if reading the records fails
+            # (e.g. a malformed CSV file), the ones added before stay consistent with the file
+            if is_lazy:
+                self.records.reload()
+            if added:
+                self.generation += 1
+                # Inserting keys one by one is slower than sorting them all again on the next phone search
+                self.phone_index.reset()
+                self.orderings.clear()
+                if self.cache is not None:
+                    self.cache.clear()
+                if self.parallel_searcher is not None:
+                    # Workers get their shards anew on the next search
+                    self.parallel_searcher.close()
+
+        return added, skipped
+
+    def compact(self) -> None:
+        """Write all the records to file and clear the journal"""
+        self.__rewrite()
+        self.journal.clear()
+
+    def close(self) -> None:
+        """Fold pending journal entries into the file and release resources before exiting"""
+        if self.journal.size:
+            self.compact()
+        if isinstance(self.records, LazyRecords):
+            self.records.close()
+        if self.parallel_searcher is not None:
+            self.parallel_searcher.close()
 
     def search(self, search_criteria: dict, is_strict: bool, is_case_sensitive: bool) -> list[dict]:
         """Return the list of records matching specified criteria"""
-        result = []
+        return self.__search(search_criteria, is_strict, is_case_sensitive)
+
+    def refine(self, search_criteria: dict, is_strict: bool, is_case_sensitive: bool) -> list[dict]:
+        """Same as search(), but if the criteria narrow down the ones of the last search,
+        only the records found by it are checked"""
+        normalized_criteria = normalize_criteria(search_criteria, is_case_sensitive)
+
+        if self.last_search is None:
+            return self.__search(search_criteria, is_strict, is_case_sensitive)
+        last_criteria, last_is_strict, last_is_case_sensitive, generation, last_positions = self.last_search
+        if (last_is_strict, last_is_case_sensitive, generation) != (is_strict, is_case_sensitive, self.generation):
+            return self.__search(search_criteria, is_strict, is_case_sensitive)
+
+        # Every record matching the new criteria has to match the old ones. It's true if a criterion is added,
+        # or if a value is extended in case of `in` comparison (e.g. "Ив" -> "Иван").
+        for key, last_value in last_criteria.items():
+            if (value := normalized_criteria.get(key)) is None:
+                return self.__search(search_criteria, is_strict, is_case_sensitive)
+            if value != last_value and (is_strict or last_value not in value):
+                return self.__search(search_criteria, is_strict, is_case_sensitive)
+
+        matches = make_matcher(normalized_criteria, is_strict, is_case_sensitive)
+        positions = [i for i in last_positions if matches(self.records[i])]
+        self.last_scanned = len(last_positions)
+        if self.cache is not None:
+            self.cache.put(SearchCache.make_key(normalized_criteria, is_strict, is_case_sensitive), positions)
+
+        self.last_search = (normalized_criteria, is_strict, is_case_sensitive, self.generation, positions)
+        return [self.records[i] for i in positions]
+
+    def search_phone(self, number: str, mode: str = "prefix", fields: Iterable[str] | None = None) -> list[dict]:
+        """Return the list of records having a phone number that equals, starts or ends with the given one
+        (mode is "exact", "prefix" or "suffix"). Only digits are compared, so formatting doesn't matter."""
+        if fields is not None and not set(fields := tuple(fields)) <= set(self.phone_index.fields):
+            raise ValueError(f"Not a phone field among: {fields}")
+        return [self.records[i] for i in self.phone_index.find(number, mode, fields)]
+
+    def sorted_by(self, fields: Iterable[str], records: Iterable[Mapping] | None = None) -> SortedRecords:
+        """Return all the records, or the given ones (e.g. found), sorted by the values of the fields.
+        Values are compared case-insensitively, IDs are compared as numbers."""
+        fields = tuple(fields)
+        if (ordering := self.orderings.get(fields)) is None:
+            ordering = self.orderings[fields] = Ordering(fields, self.records, numeric_fields=self.fieldnames[:1])
+        if records is not None:
+            ordering = ordering.subset(int(record[self.fieldnames[0]]) - 1 for record in records)
+        return SortedRecords(self.records, ordering)
+
+    def __search(self, search_criteria: dict, is_strict: bool, is_case_sensitive: bool) -> list[dict]:
+        """Same as search(). It's called by refine() too, so that Diagnostics counts such a search once."""
+        search_criteria = normalize_criteria(search_criteria, is_case_sensitive)
 
-        # Remove pairs with None and "" values, taking the case sensitivity flag into account
-        if is_case_sensitive:
-            search_criteria = {k: v for k, v in search_criteria.items() if v}
+        if self.cache is None:
+            positions = self.__find(search_criteria, is_strict, is_case_sensitive)
         else:
-            search_criteria = {k: v.lower() for k, v in search_criteria.items() if v}
+            key = SearchCache.make_key(search_criteria, is_strict, is_case_sensitive)
+            if (positions := self.cache.get(key)) is None:
+                positions = self.__find(search_criteria, is_strict, is_case_sensitive)
+                self.cache.put(key, positions)
+            else:
+                self.last_scanned = 0
 
-        if is_strict:
-            # Use `==` to compare records
-            for record in self.records:
-                if all(search_criteria[key] == record[key].lower() for key in search_criteria):
-                    result.append(record)
+        self.last_search = (search_criteria, is_strict, is_case_sensitive, self.generation, positions)
+        return [self.records[i] for i in positions]
+
+    def __find(self, search_criteria: dict, is_strict: bool, is_case_sensitive: bool) -> list[int]:
+        """Return positions of records matching already normalized criteria, using the chosen search backend"""
+        positions = None
+        self.last_scanned = len(self.records)
+        if self.index is not None:
+            positions = self.index.search(search_criteria, is_strict, is_case_sensitive)
+            self.last_scanned = self.index.last_scanned
+        elif self.parallel_searcher is not None and search_criteria:
+            positions = self.parallel_searcher.search(search_criteria, is_strict, is_case_sensitive)
+        elif self.mmap_searcher is not None and search_criteria:
+            # It's None if the file can't be searched this way, then the records are scanned as usual
+            positions = self.__search_file(search_criteria, is_strict, is_case_sensitive)
+
+        if positions is None:
+            if isinstance(self.records, ColumnarRecords):
+                positions = self.records.find(search_criteria, is_strict, is_case_sensitive)
+            else:
+                # Linear scan over all the records
+                matches = make_matcher(search_criteria, is_strict, is_case_sensitive)
+                positions = [i for i, record in enumerate(self.records) if matches(record)]
+
+        return positions
+
+    def __search_file(self, search_criteria: dict, is_strict: bool, is_case_sensitive: bool) -> list[int] | None:
+        """Search the file with MmapSearcher, checking records that are only in the journal separately"""
+        if (positions := self.mmap_searcher.search(search_criteria, is_strict, is_case_sensitive)) is None:
+            return None
+
+        # Versions of these records in file are outdated
+        if logged_positions := self.journal.positions:
+            matches = make_matcher(search_criteria, is_strict, is_case_sensitive)
+            positions = [position for position in positions if position not in logged_positions]
+            positions.extend(position for position in logged_positions if matches(self.records[position]))
+            positions.sort()
+        return positions
+
+    def __append_batch(self, writer: DictWriter, batch: list[dict], is_lazy: bool) -> None:
+        """Write records appended by add_many(), then add them to the records and the index"""
+        writer.writerows(batch)
+        for record in batch:
+            if not is_lazy:
+                self.records.append(record)
+            if self.index is not None:
+                self.index.add(int(record["ID"]) - 1, record)
+
+    def __validate(self, record: dict) -> None:
+        """Make sure a record has exactly the DB fields before it's written anywhere"""
+        if set(record) != set(self.fieldnames):
+            raise ValueError(f"Record fields {tuple(record)} don't match {self.fieldnames}")
+
+    def __rewrite(self) -> None:
+        """Write all the records to a temporary file and atomically replace the DB file with it"""
+        tmp_file = self.file.with_name(f"{self.file.name}.tmp")
+        with open(tmp_file, "w", encoding="utf-8", newline="") as f:
+            writer = DictWriter(f, fieldnames=self.fieldnames)
+            writer.writeheader()
+            writer.writerows(self.records)
+            f.flush()
+            os.fsync(f.fileno())
+
+        if isinstance(self.records, LazyRecords):
+            # The records are read from the file being replaced. Once it's done, they are all in the new file.
+            self.records.close()
+            os.replace(tmp_file, self.file)
+            self.records.reload()
         else:
-            # Use `in` to compare records
-            for record in self.records:
-                if all(search_criteria[key] in record[key].lower() for key in search_criteria):
-                    result.append(record)
+            os.replace(tmp_file, self.file)
+            if self.snapshot is not None:
+                self.__save_snapshot()
 
-        return result
+    def __save_snapshot(self) -> None:
+        """Write the records to the snapshot. They must be the same as in file."""
+        if isinstance(self.records, ColumnarRecords):
+            columns = [self.records.get_column(name) for name in self.fieldnames]
+        else:
+            columns = [[record[name] for record in self.records] for name in self.fieldnames]
+        self.snapshot.save(self.file, columns)
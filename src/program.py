@@ -1,27 +1,28 @@
-import os
 import sys
-from itertools import islice
+from collections.abc import Sequence
 
 from config import Config
+from pages import Pages
 from phonebook import Phonebook
+from screen import Screen
 
 
 class Program:
     """Basically, the UI class. It uses Phonebook to manipulate all the records."""
 
-    def __init__(self) -> None:
-        self.config = Config()
+    def __init__(self, config: Config | None = None) -> None:
+        self.screen = Screen()
+
+        self.config = Config() if config is None else config
         if self.config.file_not_found:
-            Program.clear_screen()
-            input(
+            self.__input(
                 f"Файл настроек '{self.config.file}' не найден! Создан файл со стандартными настройками.\n\n"
                 "Нажмите Enter чтобы продолжить..."
             )
 
-        self.phonebook = Phonebook()
+        self.phonebook = Phonebook.from_config(self.config)
         if self.phonebook.file_not_found:
-            Program.clear_screen()
-            input(
+            self.__input(
                 f"Файл с данными '{self.phonebook.file}' не найден! Создан пустой файл.\n\n"
                 "Нажмите Enter чтобы продолжить..."
             )
@@ -33,8 +34,7 @@ class Program:
     def __render_main_menu(self) -> None:
         """Main menu"""
         while True:
-            Program.clear_screen()
-            user_input = input(
+            user_input = self.__input(
                 "Телефонный справочник\n\n"
                 "1. Просмотреть записи\n"
                 "2. Добавить запись\n"
@@ -54,7 +54,7 @@ class Program:
                 case "4":
                     self.__render_search_section()
                 case "5":
-                    Program.close()
+                    self.close()
                 case _:
                     continue
 
@@ -62,16 +62,16 @@ class Program:
         """Menu section for viewing records page by page"""
         pages = self.__chunk_records(self.phonebook.records)
         current_page_index = 0
+        sort_fields = ()
 
         while True:
-            Program.clear_screen()
-            print(f"Телефонный справочник (c. {current_page_index + 1})\n")
-            self.__print_table(pages[current_page_index])
-
-            user_input = input(
-                "\n1. Следующая страница\n"
+            user_input = self.__input(
+                f"Телефонный справочник (c. {current_page_index + 1}{Program.__describe_sorting(sort_fields)})\n\n"
+                f"{self.__render_table(pages[current_page_index])}\n"
+                "1. Следующая страница\n"
                 "2. Предыдущая страница\n"
-                "3. Главное меню\n\n"
+                "3. Сортировка\n"
+                "4. Главное меню\n\n"
                 "Введите номер пункта меню: "
             ).strip()
 
@@ -83,6 +83,11 @@ class Program:
                     if current_page_index > 0:
                         current_page_index -= 1
                 case "3":
+                    sort_fields = self.__choose_sort_fields()
+                    records = self.phonebook.sorted_by(sort_fields) if sort_fields else self.phonebook.records
+                    pages = self.__chunk_records(records)
+                    current_page_index = 0
+                case "4":
                     self.__render_main_menu()
                 case _:
                     continue
@@ -94,15 +99,12 @@ class Program:
         # It's generated automatically, not received from user input.
         new_record = {"ID": f"{len(self.phonebook.records) + 1}"}
         for name in self.phonebook.fieldnames[1:]:
-            new_record[name] = self.__guarded_input(
-                f"Телефонный справочник (новая запись)\n\n{name}: ", clear_screen=True
-            )
+            new_record[name] = self.__guarded_input(f"Телефонный справочник (новая запись)\n\n{name}: ")
 
         self.phonebook.add(new_record)
 
         while True:
-            Program.clear_screen()
-            user_input = input(
+            user_input = self.__input(
                 "Телефонный справочник (новая запись)\n\n"
                 "Запись успешно добавлена!\n\n"
                 "1. Добавить еще одну\n"
@@ -122,8 +124,7 @@ class Program:
         """Menu section for editing an existing record"""
         while True:
             user_input = self.__guarded_input(
-                "Телефонный справочник (редактирование записи)\n\nВведите ID записи, подлежащей редактированию: ",
-                clear_screen=True,
+                "Телефонный справочник (редактирование записи)\n\nВведите ID записи, подлежащей редактированию: "
             )
 
             # Check if record ID is a positive integer in valid range
@@ -132,12 +133,10 @@ class Program:
                     break
 
         while True:
-            Program.clear_screen()
-            print("Телефонный справочник (редактирование записи)\n")
-            self.__print_table([self.phonebook.records[record_id - 1]])
-
-            user_input = input(
-                "\n1. Отредактировать данную запись\n2. Главное меню\n\nВведите номер пункта меню: "
+            user_input = self.__input(
+                "Телефонный справочник (редактирование записи)\n\n"
+                f"{self.__render_table([self.phonebook.records[record_id - 1]])}\n"
+                "1. Отредактировать данную запись\n2. Главное меню\n\nВведите номер пункта меню: "
             ).strip()
 
             match user_input:
@@ -145,14 +144,13 @@ class Program:
                     new_record = {"ID": f"{record_id}"}
                     for name in self.phonebook.fieldnames[1:]:
                         new_record[name] = self.__guarded_input(
-                            f"Телефонный справочник (редактирование записи)\n\n{name}: ", clear_screen=True
+                            f"Телефонный справочник (редактирование записи)\n\n{name}: "
                         )
 
                     self.phonebook.edit(record_id, new_record)
 
                     while True:
-                        Program.clear_screen()
-                        user_input = input(
+                        user_input = self.__input(
                             "Телефонный справочник (редактирование записи)\n\n"
                             "Запись успешно отредактирована!\n\n"
                             "1. Отредактировать еще одну\n"
@@ -177,8 +175,7 @@ class Program:
         search_criteria = dict.fromkeys(self.phonebook.fieldnames)
 
         while True:
-            Program.clear_screen()
-            user_input = input(
+            user_input = self.__input(
                 "Телефонный справочник (поиск по записям)\n\n"
                 "Пожалуйста, задайте критерии для поиска\n\n"
                 f"1. ID - {search_criteria['ID'] or 'не задан'}\n"
@@ -193,39 +190,38 @@ class Program:
                 "Введите номер пункта меню: "
             ).strip()
 
-            Program.clear_screen()
             match user_input:
                 case "1":
                     search_criteria["ID"] = self.__guarded_input(
-                        "Телефонный справочник (поиск по записям)\n\nВведите ID: ", clear_screen=True
+                        "Телефонный справочник (поиск по записям)\n\nВведите ID: "
                     )
                 case "2":
                     search_criteria["Имя"] = self.__guarded_input(
-                        "Телефонный справочник (поиск по записям)\n\nВведите имя: ", clear_screen=True
+                        "Телефонный справочник (поиск по записям)\n\nВведите имя: "
                     )
                 case "3":
                     search_criteria["Отчество"] = self.__guarded_input(
-                        "Телефонный справочник (поиск по записям)\n\nВведите отчество: ", clear_screen=True
+                        "Телефонный справочник (поиск по записям)\n\nВведите отчество: "
                     )
                 case "4":
                     search_criteria["Фамилия"] = self.__guarded_input(
-                        "Телефонный справочник (поиск по записям)\n\nВведите фамилию: ", clear_screen=True
+                        "Телефонный справочник (поиск по записям)\n\nВведите фамилию: "
                     )
                 case "5":
                     search_criteria["Организация"] = self.__guarded_input(
-                        "Телефонный справочник (поиск по записям)\n\nВведите организацию: ", clear_screen=True
+                        "Телефонный справочник (поиск по записям)\n\nВведите организацию: "
                     )
                 case "6":
                     search_criteria["Рабочий телефон"] = self.__guarded_input(
-                        "Телефонный справочник (поиск по записям)\n\nВведите рабочий телефон: ", clear_screen=True
+                        "Телефонный справочник (поиск по записям)\n\nВведите рабочий телефон: "
                     )
                 case "7":
                     search_criteria["Личный телефон"] = self.__guarded_input(
-                        "Телефонный справочник (поиск по записям)\n\nВведите личный телефон: ", clear_screen=True
+                        "Телефонный справочник (поиск по записям)\n\nВведите личный телефон: "
                     )
                 case "8":
                     if not (
-                        found_records := self.phonebook.search(
+                        found_records := self.phonebook.refine(
                             search_criteria,
                             is_strict=self.config.search_is_strict,
                             is_case_sensitive=self.config.search_is_case_sensitive,
@@ -233,8 +229,7 @@ class Program:
                     ):
                         # "Nothing was found" menu section
                         while True:
-                            Program.clear_screen()
-                            user_input = input(
+                            user_input = self.__input(
                                 "Телефонный справочник (результаты поиска)\n\n"
                                 "Поиск с заданными критериями не дал результата\n\n"
                                 "1. Изменить критерии\n"
@@ -253,16 +248,17 @@ class Program:
                         # "Successful search results" menu section
                         pages = self.__chunk_records(found_records)
                         current_page_index = 0
+                        sort_fields = ()
 
                         while True:
-                            Program.clear_screen()
-                            print(f"Телефонный справочник (результаты поиска c. {current_page_index + 1})\n")
-                            self.__print_table(pages[current_page_index])
-
-                            user_input = input(
-                                "\n1. Следующая страница\n"
+                            user_input = self.__input(
+                                "Телефонный справочник (результаты поиска "
+                                f"c. {current_page_index + 1}{Program.__describe_sorting(sort_fields)})\n\n"
+                                f"{self.__render_table(pages[current_page_index])}\n"
+                                "1. Следующая страница\n"
                                 "2. Предыдущая страница\n"
-                                "3. Главное меню\n\n"
+                                "3. Сортировка\n"
+                                "4. Главное меню\n\n"
                                 "Введите номер пункта меню: "
                             ).strip()
 
@@ -274,6 +270,13 @@ class Program:
                                     if current_page_index > 0:
                                         current_page_index -= 1
                                 case "3":
+                                    sort_fields = self.__choose_sort_fields()
+                                    records = found_records
+                                    if sort_fields:
+                                        records = self.phonebook.sorted_by(sort_fields, found_records)
+                                    pages = self.__chunk_records(records)
+                                    current_page_index = 0
+                                case "4":
                                     self.__render_main_menu()
                                 case _:
                                     continue
@@ -282,37 +285,59 @@ class Program:
                 case _:
                     continue
 
-    def __print_table(self, records: list[dict] | tuple[dict]) -> None:
-        """Print given records in a pretty table. To some extent."""
-        print("=" * len(self.phonebook.fieldnames) * (self.config.column_width + 1))
-        print(*(field.center(self.config.column_width) for field in self.phonebook.fieldnames), sep="|")
-        print("=" * len(self.phonebook.fieldnames) * (self.config.column_width + 1))
+    def __render_table(self, records: Sequence) -> str:
+        """Return given records as a pretty table, a line per record. To some extent."""
+        border = "=" * len(self.phonebook.fieldnames) * (self.config.column_width + 1)
+        header = "|".join(field.center(self.config.column_width) for field in self.phonebook.fieldnames)
+        lines = [border, header, border]
         for record in records:
-            print(*(value.ljust(self.config.column_width) for value in record.values()), sep="|")
+            lines.append("|".join(value.ljust(self.config.column_width) for value in record.values()))
+        return "\n".join(lines) + "\n"
 
-    def __guarded_input(self, prompt: str, clear_screen: bool = False) -> str:
-        """To accept data that fits into a table column"""
+    def __choose_sort_fields(self) -> tuple[str, ...]:
+        """Ask for the fields to sort records by. No fields means the order of the file."""
+        fields = "".join(f"{i}. {name}\n" for i, name in enumerate(self.phonebook.fieldnames, 1))
         while True:
-            if clear_screen:
-                Program.clear_screen()
+            user_input = self.__input(
+                f"Телефонный справочник (сортировка)\n\n{fields}\n"
+                "Введите номера полей через пробел, например, 4 2 -- по фамилии, затем по имени.\n"
+                "Оставьте пустым для порядка по ID: "
+            ).split()
 
-            input_data = input(prompt).strip()
+            if all(number.isdigit() and 0 < int(number) <= len(self.phonebook.fieldnames) for number in user_input):
+                sort_fields = tuple(self.phonebook.fieldnames[int(number) - 1] for number in user_input)
+                # A repeated field doesn't change the order
+                return tuple(dict.fromkeys(sort_fields))
+
+    @staticmethod
+    def __describe_sorting(sort_fields: Sequence[str]) -> str:
+        """Return the sort fields for a section title"""
+        return f", сортировка: {', '.join(sort_fields)}" if sort_fields else ""
+
+    def __input(self, frame: str) -> str:
+        """Show a frame ending with a prompt and return the user input"""
+        self.screen.draw(frame)
+        return input()
+
+    def __guarded_input(self, frame: str) -> str:
+        """To accept data that fits into a table column"""
+        while True:
+            input_data = self.__input(frame).strip()
 
             if len(input_data) <= self.config.column_width:
                 return input_data
 
-    def __chunk_records(self, records: list[dict]) -> list[tuple]:
-        """Split list of records into equally sized tuples (the last one may vary)"""
-        it = iter(records)
-        return list(iter(lambda: tuple(islice(it, self.config.records_per_page)), ()))
+    def __chunk_records(self, records: Sequence) -> Pages:
+        """Split records into equally sized pages (the last one may vary)"""
+        return Pages(records, self.config.records_per_page)
 
     @staticmethod
     def clear_screen() -> None:
         """Clear the command line on any platform"""
-        os.system("cls" if sys.platform == "win32" else "clear")
+        Screen().clear()
 
-    @staticmethod
-    def close() -> None:
-        """Clear the command line and exit the program"""
-        Program.clear_screen()
+    def close(self) -> None:
+        """Clear the command line, flush pending changes to file and exit the program"""
+        self.phonebook.close()
+        self.screen.clear()
         sys.exit()
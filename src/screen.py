@@ -0,0 +1,101 @@
+import os
+import shutil
+import sys
+from typing import TextIO
+
+# Cursor to the top left corner, then erase the screen and the scrollback
+CLEAR = "\x1b[H\x1b[2J\x1b[3J"
+# Erase from the cursor to the end of the line / of the screen
+ERASE_LINE = "\x1b[K"
+ERASE_BELOW = "\x1b[J"
+
+
+def move_to(row: int) -> str:
+    """Return the sequence moving the cursor to the beginning of a row (0-based)"""
+    return f"\x1b[{row + 1};1H"
+
+
+def enable_ansi() -> bool:
+    """Make the console understand ANSI escape sequences. Only Windows consoles need it, and old ones can't do it."""
+    if sys.platform != "win32":
+        return True
+    try:
+        import ctypes
+
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
+        mode = ctypes.c_uint32()
+        if not kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+            return False
+        return bool(kernel32.SetConsoleMode(handle, mode.value | 0x0004))  # ENABLE_VIRTUAL_TERMINAL_PROCESSING
+    except (AttributeError, OSError):
+        return False
+
+
+class Screen:
+    """Draws frames in the terminal. A frame is the whole screen content, its last line is a prompt for input.
+
+    Only the lines that have changed or moved since the previous frame are redrawn, each frame is written in one call.
+    Lines longer than the terminal width wrap, so the row of every line is worked out from the lengths of the lines
+    above it. The whole frame is redrawn if the rows may be wrong: after the screen has scrolled (the frame doesn't fit
+    in the terminal) or the terminal has been resized.
+    """
+
+    def __init__(self, output: TextIO = sys.stdout) -> None:
+        self.output = output
+        self.is_ansi_enabled = enable_ansi()
+        # Lines of the frame on the screen, rows they start at and the terminal size they were drawn for,
+        # None if unknown
+        self.lines: list[str] | None = None
+        self.rows: list[int] | None = None
+        self.terminal_size: os.terminal_size | None = None
+
+    def clear(self) -> None:
+        """Erase the screen"""
+        self.lines = None
+        if self.is_ansi_enabled:
+            self.output.write(CLEAR)
+            self.output.flush()
+        else:
+            os.system("cls" if sys.platform == "win32" else "clear")
+
+    def draw(self, frame: str) -> None:
+        """Show a frame, leaving the cursor at the end of its last line"""
+        lines = frame.split("\n")
+        terminal_size = shutil.get_terminal_size()
+        columns = terminal_size.columns
+        # A line takes as many rows as it wraps into, an empty one takes a row too
+        rows = [0]
+        for line in lines:
+            rows.append(rows[-1] + max(1, -(-len(line) // columns)))
+        # The input after the prompt takes one more row
+        fits = rows[-1] < terminal_size.lines
+
+        if not self.is_ansi_enabled:
+            self.clear()
+            self.output.write(frame)
+        elif not fits or self.lines is None or terminal_size != self.terminal_size:
+            self.output.write(CLEAR + frame)
+        else:
+            # The prompt line always differs, as the previous input was echoed after it
+            parts = []
+            for i, line in enumerate(lines[:-1]):
+                if self.__differs(i, rows[i], line):
+                    parts += [move_to(rows[i]), line]
+                    # The cursor stays in the last column after a line filling its last row, erasing would remove
+                    # the last character. Such a line covers its rows completely anyway.
+                    if len(line) % columns or not line:
+                        parts.append(ERASE_LINE)
+            parts += [move_to(rows[-2]), ERASE_BELOW, lines[-1]]
+            self.output.write("".join(parts))
+        self.output.flush()
+
+        if fits and self.is_ansi_enabled:
+            self.lines, self.rows = lines, rows
+        else:
+            self.lines = self.rows = None
+        self.terminal_size = terminal_size
+
+    def __differs(self, i: int, row: int, line: str) -> bool:
+        """Tell if the given line isn't the one already on the screen at the given row"""
+        return i >= len(self.lines) - 1 or self.rows[i] != row or self.lines[i] != line
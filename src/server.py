@@ -0,0 +1,195 @@
+import asyncio
+import json
+from argparse import ArgumentParser
+from collections.abc import Callable
+
+from config import Config
+from diagnostics import Diagnostics
+from phone_index import PhoneIndex
+from phonebook import Phonebook, control_characters
+
+
+class PhonebookServer:
+    """Answers requests to a phonebook loaded once, using line-delimited JSON.
+
+    A request is a JSON object on its own line, e.g. {"id": 1, "op": "search", "criteria": {"Имя": "Иван"}}.
+    Supported ops are "search" (optional "strict" and "case_sensitive" flags override the settings),
+    "phone" ("number", optional "mode" -- "exact", "prefix" (default) or "suffix" -- and "fields" to look in),
+    "get" and "edit" (both take "record_id"), "add" ("record" holds the fields, ID is assigned)
+    and "stats" (number of records and counters of the search cache, null if it's disabled).
+    A response echoes "id" and has either "ok": true with "result" or "ok": false with "error".
+    Requests may be pipelined. Responses are sent as soon as they are ready, so they may come out of order.
+    Reads are handled right away, while adds and edits are applied one by one by a single writer task.
+    So a read pipelined after a write sees its result only once the write is responded to.
+    """
+
+    def __init__(self, phonebook: Phonebook, config: Config) -> None:
+        self.phonebook = phonebook
+        self.config = config
+        self.write_queue: asyncio.Queue[tuple[Callable, asyncio.Future]] = asyncio.Queue()
+
+    async def serve(self, host: str, port: int, unix_path: str | None = None) -> None:
+        """Accept connections until cancelled"""
+        writer_task = asyncio.create_task(self.__apply_writes())
+        if unix_path is None:
+            server = await asyncio.start_server(self.__handle_connection, host, port)
+        else:
+            server = await asyncio.start_unix_server(self.__handle_connection, unix_path)
+
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            writer_task.cancel()
+
+    async def __handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Read requests from a client and handle each one in a separate task"""
+        tasks = set()
+        try:
+            while line := await reader.readline():
+                task = asyncio.create_task(self.__handle_request(line, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.wait(tasks)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def __handle_request(self, line: bytes, writer: asyncio.StreamWriter) -> None:
+        """Handle a single request and send the response"""
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            response = {"id": request_id, "ok": True, "result": await self.__dispatch(request)}
+        except Exception as e:
+            # Any failure, e.g. a full disk on a write, is reported to the client instead of dropping the request
+            response = {"id": request_id, "ok": False, "error": str(e) or type(e).__name__}
+
+        writer.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+        try:
+            await writer.drain()
+        except ConnectionError:
+            # The client is gone, nobody to respond to
+            pass
+
+    async def __dispatch(self, request: dict):
+        """Run the operation of a request and return its result"""
+        match request["op"]:
+            case "search":
+                found_records = self.phonebook.search(
+                    self.__get_criteria(request),
+                    is_strict=request.get("strict", self.config.search_is_strict),
+                    is_case_sensitive=request.get("case_sensitive", self.config.search_is_case_sensitive),
+                )
+                return [dict(record) for record in found_records]
+            case "phone":
+                if (mode := request.get("mode", "prefix")) not in PhoneIndex.modes:
+                    raise ValueError(f"неизвестный режим поиска номера: {mode}")
+                phone_fieldnames = self.phonebook.phone_index.fields
+                if not set(fields := request.get("fields", phone_fieldnames)) <= set(phone_fieldnames):
+                    raise ValueError(f"поиск по номеру возможен только в полях {', '.join(phone_fieldnames)}")
+                found_records = self.phonebook.search_phone(request["number"], mode, fields)
+                return [dict(record) for record in found_records]
+            case "stats":
+                cache = self.phonebook.cache
+                return {"records": len(self.phonebook.records), "cache": None if cache is None else cache.stats()}
+            case "get":
+                return dict(self.phonebook.records[self.__get_position(request)])
+            case "add":
+                record = self.__get_record(request)
+                return await self.__write(lambda: self.__add(record))
+            case "edit":
+                record = self.__get_record(request)
+                return await self.__write(lambda: self.__edit(self.__get_position(request), record))
+            case op:
+                raise ValueError(f"неизвестная операция: {op}")
+
+    async def __write(self, write: Callable) -> dict:
+        """Pass a write operation to the writer task and wait for its result"""
+        future = asyncio.get_running_loop().create_future()
+        await self.write_queue.put((write, future))
+        return await future
+
+    async def __apply_writes(self) -> None:
+        """The only place where records are changed, so file writes never interleave"""
+        while True:
+            write, future = await self.write_queue.get()
+            try:
+                result = write()
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(result)
+
+    def __add(self, record: dict) -> dict:
+        """Add a record, assigning it the next ID"""
+        record = {"ID": f"{len(self.phonebook.records) + 1}", **record}
+        self.phonebook.add(record)
+        return record
+
+    def __edit(self, position: int, record: dict) -> dict:
+        """Replace a record keeping its ID"""
+        record = {"ID": f"{position + 1}", **record}
+        self.phonebook.edit(position + 1, record)
+        return record
+
+    def __get_position(self, request: dict) -> int:
+        """Return the position of the record a request refers to"""
+        record_id = request["record_id"]
+        # JSON true and false are ints in Python
+        if type(record_id) is not int or not 0 < record_id <= len(self.phonebook.records):
+            raise ValueError(f"нет записи с ID {record_id}")
+        return record_id - 1
+
+    def __get_criteria(self, request: dict) -> dict:
+        """Return the search criteria of a request, checked like a query of the batch mode"""
+        criteria = request["criteria"]
+        for name, value in criteria.items():
+            if name not in self.phonebook.fieldnames:
+                raise ValueError(f"нет поля '{name}'")
+            if not isinstance(value, str):
+                raise ValueError(f"'{name}' должно быть строкой")
+        return criteria
+
+    def __get_record(self, request: dict) -> dict:
+        """Return the fields of a record from a request, validated like a user input in Program.
+        input() never returns control characters, so they are rejected too."""
+        fields = request["record"]
+        record = {}
+        for name in self.phonebook.fieldnames[1:]:
+            if not isinstance(value := fields.get(name, ""), str):
+                raise ValueError(f"'{name}' должно быть строкой")
+            if len(value := value.strip()) > self.config.column_width:
+                raise ValueError(f"'{name}' длиннее {self.config.column_width} символов")
+            if control_characters.search(value):
+                raise ValueError(f"'{name}' содержит управляющие символы, например перенос строки")
+            record[name] = value
+        return record
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Сервер телефонного справочника (JSON, по одному запросу в строке)")
+    parser.add_argument("--host", default="127.0.0.1", help="адрес (по умолчанию -- 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="порт (по умолчанию -- 8765)")
+    parser.add_argument("--unix", metavar="PATH", help="слушать Unix-сокет вместо TCP")
+    args = parser.parse_args()
+
+    config = Config()
+    if (diagnostics := Diagnostics.from_config(config)) is not None:
+        diagnostics.start()
+    phonebook = Phonebook.from_config(config)
+    try:
+        asyncio.run(PhonebookServer(phonebook, config).serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        phonebook.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import heapq
+from bisect import bisect_left, insort
+from collections.abc import Iterable, Mapping, Sequence
+
+
+def sort_key(value: str) -> str:
+    """Return a case-insensitive sort key putting Ё right after Е, as in the Russian alphabet
+    (its code point is out of order, after Я)"""
+    return value.casefold().replace("ё", "е\U0010ffff")
+
+
+class Ordering:
+    """Positions of records sorted by the values of given fields. A key per record is computed once.
+
+    Only as many leading positions as requested are selected with a heap, so the first pages don't need a full sort.
+    Once a large enough part of them is requested, all the positions are sorted.
+    Either way the selected ones are kept up to date on add/edit by bisection. Ties are resolved by position.
+    """
+
+    # Share of the records that is sorted completely instead of being selected
+    full_sort_share = 0.25
+
+    def __init__(self, fields: Sequence[str], records: Sequence[Mapping], numeric_fields: Iterable[str] = ()) -> None:
+        self.fields = tuple(fields)
+        self.numeric_fields = frozenset(numeric_fields)
+        # Position -> key
+        self.keys = [self.make_key(record) for record in records]
+        # Positions of the ordered records if only some of them are ordered, see subset()
+        self.positions: list[int] | None = None
+        # The first (key, position) pairs in order, all of them if is_complete
+        self.head: list[tuple[tuple, int]] = []
+        self.is_complete = not self.keys
+
+    def __len__(self) -> int:
+        return len(self.keys) if self.positions is None else len(self.positions)
+
+    def make_key(self, record: Mapping) -> tuple:
+        """Return the sort key of a record"""
+        return tuple(
+            int(record[field]) if field in self.numeric_fields else sort_key(record[field]) for field in self.fields
+        )
+
+    def get(self, start: int, stop: int) -> list[int]:
+        """Return positions of records from start to stop in the sorted order"""
+        if stop > len(self.head) and not self.is_complete:
+            if self.positions is None:
+                entries = zip(self.keys, range(len(self.keys)))
+            else:
+                entries = ((self.keys[position], position) for position in self.positions)
+
+            if stop >= len(self) * Ordering.full_sort_share:
+                self.head = sorted(entries)
+                self.is_complete = True
+            else:
+                # Select a bit more, so that paging forward doesn't need a selection per page
+                self.head = heapq.nsmallest(max(stop, 2 * len(self.head)), entries)
+        return [position for _, position in self.head[start:stop]]
+
+    def add(self, position: int, record: Mapping) -> None:
+        """Take into account a record appended to the records"""
+        entry = (self.make_key(record), position)
+        self.keys.append(entry[0])
+        if self.is_complete or (self.head and entry < self.head[-1]):
+            insort(self.head, entry)
+
+    def replace(self, position: int, new_record: Mapping) -> None:
+        """Take into account a record that has been edited"""
+        old_entry = (self.keys[position], position)
+        new_entry = (self.make_key(new_record), position)
+        self.keys[position] = new_entry[0]
+
+        # The rest of the head is still the leading records without the old entry
+        if self.head and old_entry <= self.head[-1]:
+            del self.head[bisect_left(self.head, old_entry)]
+        # Records that aren't selected go after all the selected ones, so the new entry is only added before them
+        if self.is_complete or (self.head and new_entry < self.head[-1]):
+            insort(self.head, new_entry)
+
+    def subset(self, positions: Iterable[int]) -> "Ordering":
+        """Return the ordering of some of the records, e.g. found ones. It shares the keys, but isn't kept up to date
+        on add/edit, just like a list of found records."""
+        ordering = Ordering(self.fields, (), self.numeric_fields)
+        ordering.keys = self.keys
+        ordering.positions = list(positions)
+        ordering.is_complete = not ordering.positions
+        return ordering
+
+
+class SortedRecords(Sequence):
+    """Records in the order of an Ordering. A slice of them is sorted only when accessed."""
+
+    def __init__(self, records: Sequence[Mapping], ordering: Ordering) -> None:
+        self.records = records
+        self.ordering = ordering
+
+    def __len__(self) -> int:
+        return len(self.ordering)
+
+    def __getitem__(self, index: int | slice) -> Mapping | list[Mapping]:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            return [self.records[position] for position in self.ordering.get(start, stop)[::step]]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("record index out of range")
+        return self.records[self.ordering.get(index, index + 1)[0]]
@@ -0,0 +1,117 @@
+from array import array
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+
+from matching import make_value_matcher
+
+
+class RecordView(Mapping):
+    """Read-only dict-like view of a single record kept in ColumnarRecords"""
+
+    __slots__ = ("store", "position")
+
+    def __init__(self, store: "ColumnarRecords", position: int) -> None:
+        self.store = store
+        self.position = position
+
+    def __getitem__(self, key: str) -> str:
+        return self.store.get_value(self.position, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.store.fieldnames)
+
+    def __len__(self) -> int:
+        return len(self.store.fieldnames)
+
+    def __repr__(self) -> str:
+        return f"RecordView({dict(self)})"
+
+
+class ColumnarRecords(Sequence):
+    """Records stored column by column. A value repeating in a column is stored only once."""
+
+    def __init__(self, fieldnames: Sequence[str]) -> None:
+        self.fieldnames = tuple(fieldnames)
+        self.columns = {name: i for i, name in enumerate(self.fieldnames[1:])}
+
+        # ID is a dense integer, so it's kept as is
+        self.ids = array("I")
+        # Every other column is an array of codes pointing into a table of its distinct values
+        self.codes = [array("I") for _ in self.columns]
+        self.values: list[list[str]] = [[] for _ in self.columns]
+        self.value_codes: list[dict[str, int]] = [{} for _ in self.columns]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, position: int | slice) -> RecordView | list[RecordView]:
+        if isinstance(position, slice):
+            return [RecordView(self, i) for i in range(*position.indices(len(self)))]
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("record index out of range")
+        return RecordView(self, position)
+
+    def __setitem__(self, position: int, record: Mapping) -> None:
+        self.ids[position] = int(record[self.fieldnames[0]])
+        for i, name in enumerate(self.fieldnames[1:]):
+            self.codes[i][position] = self.__encode(i, record[name])
+
+    def append(self, record: Mapping) -> None:
+        """Add a record to the end"""
+        self.append_row([record[name] for name in self.fieldnames])
+
+    def append_row(self, row: Sequence[str]) -> None:
+        """Add a record given as a list of values in fieldnames order"""
+        self.ids.append(int(row[0]))
+        for i, value in enumerate(row[1:]):
+            self.codes[i].append(self.__encode(i, value))
+
+    def extend_rows(self, rows: Iterable[Sequence[str]]) -> None:
+        """Add many records given as lists of values in fieldnames order"""
+        ids = self.ids
+        columns = tuple(zip(self.codes, self.values, self.value_codes))
+        for row in rows:
+            ids.append(int(row[0]))
+            for (codes, values, value_codes), value in zip(columns, row[1:]):
+                if (code := value_codes.get(value)) is None:
+                    code = value_codes[value] = len(values)
+                    values.append(value)
+                codes.append(code)
+
+    def get_value(self, position: int, name: str) -> str:
+        """Return a single field of a record"""
+        if name == self.fieldnames[0]:
+            return f"{self.ids[position]}"
+        i = self.columns[name]
+        return self.values[i][self.codes[i][position]]
+
+    def get_column(self, name: str) -> list[str]:
+        """Return all the values of a field"""
+        if name == self.fieldnames[0]:
+            return [f"{record_id}" for record_id in self.ids]
+        i = self.columns[name]
+        values = self.values[i]
+        return [values[code] for code in self.codes[i]]
+
+    def find(self, search_criteria: dict, is_strict: bool, is_case_sensitive: bool) -> list[int]:
+        """Return positions of records matching already normalized criteria"""
+        positions: Iterable[int] = range(len(self))
+        for name, value in search_criteria.items():
+            matches = make_value_matcher(value, is_strict, is_case_sensitive)
+            if name == self.fieldnames[0]:
+                positions = [position for position in positions if matches(f"{self.ids[position]}")]
+            else:
+                # Each distinct value is checked once, then records are selected by their codes
+                i = self.columns[name]
+                matching_codes = {code for code, column_value in enumerate(self.values[i]) if matches(column_value)}
+                codes = self.codes[i]
+                positions = [position for position in positions if codes[position] in matching_codes]
+        return list(positions)
+
+    def __encode(self, i: int, value: str) -> int:
+        """Return the code of a value in the i-th column, adding the value to the table if needed"""
+        if (code := self.value_codes[i].get(value)) is None:
+            code = self.value_codes[i][value] = len(self.values[i])
+            self.values[i].append(value)
+        return code